@@ -1,49 +1,84 @@
 """Configuration settings for Serenity backend."""
 import os
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional
 from dotenv import load_dotenv
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
-# Load .env from backend directory or parent directory
 backend_dir = Path(__file__).parent
-env_file = backend_dir / ".env"
-parent_env_file = backend_dir.parent / ".env"
 
-if env_file.exists():
-    load_dotenv(env_file)
-elif parent_env_file.exists():
-    load_dotenv(parent_env_file)
-else:
-    load_dotenv()  # Try default locations
+_dotenv_loaded = False
+
+
+@lru_cache(maxsize=1)
+def _resolve_env_file() -> Optional[Path]:
+    """Find the .env file in the backend directory or its parent directory."""
+    for candidate in (backend_dir / ".env", backend_dir.parent / ".env"):
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def load_env():
+    """Load .env into the process environment, at most once per process.
+    
+    SERENITY_ENV_LOADED is inherited by reloader and worker processes,
+    which already have the loaded values and skip the file lookup.
+    """
+    global _dotenv_loaded
+    if _dotenv_loaded or os.environ.get("SERENITY_ENV_LOADED") == "1":
+        return
+    
+    env_path = _resolve_env_file()
+    if env_path:
+        load_dotenv(env_path)
+    else:
+        load_dotenv()  # Try default locations
+    os.environ["SERENITY_ENV_LOADED"] = "1"
+    _dotenv_loaded = True
+
+
+load_env()
 
 
 class Settings(BaseSettings):
-    """Application settings."""
+    """Application settings.
+    
+    Values are read from environment variables of the same name
+    (case-insensitive), falling back to the defaults below.
+    """
+    
+    # defer_build postpones building the validator/serializer until the
+    # first Settings() call instead of at import time
+    model_config = SettingsConfigDict(env_file=".env", defer_build=True, extra="ignore")
     
     # Google OAuth
-    google_client_id: str = os.getenv("GOOGLE_CLIENT_ID", "")
-    google_client_secret: str = os.getenv("GOOGLE_CLIENT_SECRET", "")
-    google_redirect_uri: str = os.getenv("GOOGLE_REDIRECT_URI", "http://localhost:8000/auth/google/callback")
+    google_client_id: str = ""
+    google_client_secret: str = ""
+    google_redirect_uri: str = "http://localhost:8000/auth/google/callback"
     
     # Notion OAuth
-    notion_client_id: str = os.getenv("NOTION_CLIENT_ID", "")
-    notion_client_secret: str = os.getenv("NOTION_CLIENT_SECRET", "")
-    notion_redirect_uri: str = os.getenv("NOTION_REDIRECT_URI", "http://localhost:8000/auth/notion/callback")
+    notion_client_id: str = ""
+    notion_client_secret: str = ""
+    notion_redirect_uri: str = "http://localhost:8000/auth/notion/callback"
     
     # API Keys
-    gemini_api_key: str = os.getenv("GEMINI_API_KEY", "")
-    elevenlabs_api_key: str = os.getenv("ELEVENLABS_API_KEY", "")
+    gemini_api_key: str = ""
+    elevenlabs_api_key: str = ""
     
     # Database
-    database_url: str = os.getenv("DATABASE_URL", "sqlite:///./serenity.db")
+    database_url: str = "sqlite:///./serenity.db"
     
     # Security
-    secret_key: str = os.getenv("SECRET_KEY", "change-this-in-production")
-    algorithm: str = os.getenv("ALGORITHM", "HS256")
+    secret_key: str = "change-this-in-production"
+    algorithm: str = "HS256"
     
-    class Config:
-        env_file = ".env"
-
+    # Logging (DEBUG, INFO, WARNING, ...)
+    log_level: str = "INFO"
 
-settings = Settings()
 
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get application settings, constructed on first use and cached."""
+    return Settings()
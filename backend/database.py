@@ -1,19 +1,61 @@
 """Database models and setup for Serenity backend."""
-from sqlalchemy import create_engine, Column, String, DateTime, Text, Integer, Boolean, Float, ForeignKey
+from sqlalchemy import create_engine, event, text, Column, String, DateTime, Text, Integer, Boolean, Float, ForeignKey, Index, JSON
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.pool import QueuePool
 from datetime import datetime
-import os
 import json
-from dotenv import load_dotenv
 from typing import Optional
+from config import get_settings
 
-load_dotenv()
+DATABASE_URL = get_settings().database_url
 
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./serenity.db")
+if "sqlite" in DATABASE_URL:
+    # Keep a pool of open SQLite connections instead of reconnecting per request.
+    # A local file connection can't go stale like a network one, so skip the
+    # SELECT 1 pre-ping and never recycle.
+    engine = create_engine(
+        DATABASE_URL,
+        connect_args={"check_same_thread": False, "timeout": 30},
+        poolclass=QueuePool,
+        pool_size=10,
+        max_overflow=20,
+        pool_timeout=10,  # Fail fast instead of queueing 30s when the pool is exhausted
+        pool_recycle=-1
+    )
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """Tune each new SQLite connection.
+        
+        WAL lets readers run while a writer commits, and synchronous=NORMAL
+        skips the fsync on every commit (still safe in WAL mode).
+        """
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.execute("PRAGMA cache_size=-65536")
+        cursor.close()
+else:
+    # Sized for the automation pipeline, which fans out to one session per
+    # parallel agent on top of the request's own session
+    engine = create_engine(
+        DATABASE_URL,
+        pool_size=20,
+        max_overflow=20,
+        pool_timeout=10,
+        pool_recycle=1800,
+        pool_pre_ping=True
+    )
+
+# Keep attributes loaded after commit so serialising a just-written object
+# doesn't trigger a refresh SELECT per row
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# Sessions for read-only endpoints: nothing is written, so never autoflush
+ReadSessionLocal = sessionmaker(autoflush=False, expire_on_commit=False, bind=engine)
 Base = declarative_base()
 
 
@@ -25,7 +67,8 @@ class OAuthToken(Base):
     access_token = Column(Text, nullable=False)
     refresh_token = Column(Text, nullable=True)
     token_expiry = Column(DateTime, nullable=True)
-    user_info = Column(Text, nullable=True)  # Store user info as JSON (first_name, email, etc.)
+    user_info = Column(JSON(none_as_null=True), nullable=True)  # User info dict (first_name, email, etc.)
+    userinfo_checked_at = Column(DateTime, nullable=True)  # Last userinfo lookup attempt, successful or not
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -33,18 +76,22 @@ class OAuthToken(Base):
 class Story(Base):
     """Extracted stories/backlog items from meetings and notes."""
     __tablename__ = "stories"
+    __table_args__ = (
+        Index("ix_stories_user_status", "user_id", "status"),
+        Index("ix_stories_user_extracted", "user_id", "extracted_at"),
+    )
     
     id = Column(String, primary_key=True)  # UUID or Notion page ID
     title = Column(Text, nullable=False)
     description = Column(Text, nullable=True)
     priority = Column(String, nullable=True)  # "high", "medium", "low"
-    status = Column(String, default="pending")  # "pending", "approved", "rejected", "archived"
-    tags = Column(Text, nullable=True)  # JSON array of tags
+    status = Column(String, default="pending", index=True)  # "pending", "approved", "rejected", "archived"
+    tags = Column(JSON(none_as_null=True), nullable=True)  # JSON array of tags
     owner = Column(String, nullable=True)  # Owner/stakeholder name
-    source_type = Column(String, nullable=False)  # "meeting", "notion", "calendar"
+    source_type = Column(String, nullable=False, index=True)  # "meeting", "notion", "calendar"
     source_id = Column(String, nullable=True)  # ID of source (meeting ID, Notion page ID, etc.)
     notion_page_id = Column(String, nullable=True)  # Notion page ID if created in Notion
-    extracted_at = Column(DateTime, default=datetime.utcnow)
+    extracted_at = Column(DateTime, default=datetime.utcnow, index=True)
     approved_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -58,6 +105,13 @@ class Story(Base):
 class ChecklistItem(Base):
     """Items displayed in the frontend checklist."""
     __tablename__ = "checklist_items"
+    __table_args__ = (
+        # Serve the checklist list's ORDER BY created_at DESC LIMIT from the index,
+        # with or without a status filter (scanned backwards for DESC)
+        Index("ix_checklist_items_user_status_created", "user_id", "status", "created_at"),
+        Index("ix_checklist_items_user_created", "user_id", "created_at"),
+        Index("ix_checklist_items_user_type_status", "user_id", "type", "status"),
+    )
     
     id = Column(String, primary_key=True)  # UUID
     type = Column(String, nullable=False)  # "story_approval", "backlog_cleanup", "release_report", "stakeholder_action", "integration_status"
@@ -66,8 +120,8 @@ class ChecklistItem(Base):
     status = Column(String, default="pending")  # "pending", "resolved", "dismissed"
     priority = Column(String, default="medium")  # "high", "medium", "low"
     action_type = Column(String, nullable=True)  # "approve", "archive", "review", "re_authenticate", etc.
-    action_data = Column(Text, nullable=True)  # JSON data for actions (e.g., story IDs, report URLs) - stored as JSON string
-    meta_data = Column(Text, nullable=True)  # Additional metadata - stored as JSON string (renamed from metadata to avoid SQLAlchemy conflict)
+    action_data = Column(JSON(none_as_null=True), nullable=True)  # JSON data for actions (e.g., story IDs, report URLs)
+    meta_data = Column(JSON(none_as_null=True), nullable=True)  # Additional metadata (renamed from metadata to avoid SQLAlchemy conflict)
     created_at = Column(DateTime, default=datetime.utcnow)
     resolved_at = Column(DateTime, nullable=True)
     user_id = Column(String, default="default")
@@ -76,13 +130,16 @@ class ChecklistItem(Base):
 class ReleaseReport(Base):
     """Automatically generated release reports."""
     __tablename__ = "release_reports"
+    __table_args__ = (
+        Index("ix_release_reports_user_status", "user_id", "status"),
+    )
     
     id = Column(String, primary_key=True)  # UUID
     title = Column(Text, nullable=False)
     content = Column(Text, nullable=False)  # Markdown content
     format = Column(String, default="markdown")  # "markdown", "pdf"
     status = Column(String, default="draft")  # "draft", "ready", "shared"
-    story_ids = Column(Text, nullable=True)  # JSON array of story IDs included
+    story_ids = Column(JSON(none_as_null=True), nullable=True)  # JSON array of story IDs included
     generated_at = Column(DateTime, default=datetime.utcnow)
     shared_at = Column(DateTime, nullable=True)
     file_path = Column(Text, nullable=True)  # Path to saved file if exported
@@ -94,6 +151,9 @@ class ReleaseReport(Base):
 class Stakeholder(Base):
     """Stakeholders mapped from stories and meetings."""
     __tablename__ = "stakeholders"
+    __table_args__ = (
+        Index("ix_stakeholders_user_name", "user_id", "name"),
+    )
     
     id = Column(String, primary_key=True)  # UUID
     name = Column(String, nullable=False)
@@ -103,7 +163,7 @@ class Stakeholder(Base):
     overdue_actions = Column(Integer, default=0)
     blocked_actions = Column(Integer, default=0)
     last_activity = Column(DateTime, nullable=True)
-    meta_data = Column(Text, nullable=True)  # Additional stakeholder data - stored as JSON string (renamed from metadata to avoid SQLAlchemy conflict)
+    meta_data = Column(JSON(none_as_null=True), nullable=True)  # Additional stakeholder data (renamed from metadata to avoid SQLAlchemy conflict)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     user_id = Column(String, default="default")
@@ -112,6 +172,9 @@ class Stakeholder(Base):
 class BacklogHealth(Base):
     """Backlog health metrics and audit results."""
     __tablename__ = "backlog_health"
+    __table_args__ = (
+        Index("ix_backlog_health_user_audit", "user_id", "audit_date"),
+    )
     
     id = Column(String, primary_key=True)  # UUID
     health_score = Column(Float, nullable=False)  # 0-100 score
@@ -119,65 +182,112 @@ class BacklogHealth(Base):
     duplicate_count = Column(Integer, default=0)
     low_priority_count = Column(Integer, default=0)
     outdated_count = Column(Integer, default=0)
-    recommendations = Column(Text, nullable=True)  # JSON array of recommendations - stored as JSON string
+    recommendations = Column(JSON(none_as_null=True), nullable=True)  # JSON array of recommendations
     audit_date = Column(DateTime, default=datetime.utcnow)
     user_id = Column(String, default="default")
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
+class BreakCustomization(Base):
+    """A user's customized break list (edited, added or removed breaks)."""
+    __tablename__ = "break_customizations"
+    
+    user_id = Column(String, primary_key=True)  # One row per user
+    breaks = Column(JSON(none_as_null=True), nullable=False, default=list)  # JSON array of break dicts
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+# Bump whenever models, indexes or init_db() migrations change so that
+# existing databases run the migration checks again on next start.
+CURRENT_SCHEMA_VERSION = 6
+
+
+class SchemaVersion(Base):
+    """Schema version recorded after init_db() migrations complete."""
+    __tablename__ = "schema_version"
+    
+    version = Column(Integer, primary_key=True)
+
+
+def _get_schema_version() -> Optional[int]:
+    """Get the recorded schema version, or None if it was never recorded."""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(text('SELECT MAX(version) FROM schema_version')).scalar()
+    except Exception:
+        # Table doesn't exist yet (new or pre-versioning database)
+        return None
+
+
+def _set_schema_version(version: int):
+    """Record the schema version so later starts can skip migrations."""
+    with engine.begin() as conn:
+        conn.execute(text('DELETE FROM schema_version'))
+        conn.execute(text('INSERT INTO schema_version (version) VALUES (:version)'), {"version": version})
+
+
 def init_db():
     """Initialize the database and create tables.
     
     Handles migrations for:
-    - Adding user_info column to oauth_tokens
+    - Adding user_info and userinfo_checked_at columns to oauth_tokens
     - Renaming metadata to meta_data (if needed)
     - Creating new automation tables
+    
+    Skipped entirely when the database already records CURRENT_SCHEMA_VERSION.
     """
+    if _get_schema_version() == CURRENT_SCHEMA_VERSION:
+        return
+    
     Base.metadata.create_all(bind=engine)
     
+    # create_all() only indexes tables it creates, so add any indexes
+    # missing from tables created before they were declared
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    
+    # Drop indexes that wider composite indexes have replaced
+    with engine.begin() as conn:
+        for index_name in ('ix_checklist_items_user_status', 'ix_checklist_items_user_type'):
+            conn.execute(text(f'DROP INDEX IF EXISTS {index_name}'))
+    
     # Migrate existing tables to add new columns if needed
     try:
-        from sqlalchemy import inspect, text
+        from sqlalchemy import inspect
         inspector = inspect(engine)
         
+        existing_tables = inspector.get_table_names()
+        
         # Check if oauth_tokens table exists
-        if 'oauth_tokens' in inspector.get_table_names():
+        if 'oauth_tokens' in existing_tables:
             columns = [col['name'] for col in inspector.get_columns('oauth_tokens')]
+            new_columns = [
+                ('user_info', 'TEXT'),
+                ('userinfo_checked_at', 'DATETIME'),
+            ]
+            missing_columns = [(name, col_type) for name, col_type in new_columns if name not in columns]
             
-            if 'user_info' not in columns:
-                # Add user_info column to existing table
-                with engine.connect() as conn:
-                    conn.execute(text('ALTER TABLE oauth_tokens ADD COLUMN user_info TEXT'))
-                    conn.commit()
-                print("✓ Added user_info column to oauth_tokens table")
+            if missing_columns:
+                with engine.begin() as conn:
+                    for name, col_type in missing_columns:
+                        conn.execute(text(f'ALTER TABLE oauth_tokens ADD COLUMN {name} {col_type}'))
+                print(f"✓ Added {', '.join(name for name, _ in missing_columns)} column(s) to oauth_tokens table")
         
         # Handle metadata -> meta_data migration for existing tables
-        # Check checklist_items table
-        if 'checklist_items' in inspector.get_table_names():
-            columns = [col['name'] for col in inspector.get_columns('checklist_items')]
-            if 'metadata' in columns and 'meta_data' not in columns:
-                # Rename metadata to meta_data
-                with engine.connect() as conn:
-                    # SQLite doesn't support RENAME COLUMN directly, so we need to recreate
-                    # For now, just add meta_data column and copy data
-                    conn.execute(text('ALTER TABLE checklist_items ADD COLUMN meta_data TEXT'))
-                    conn.execute(text('UPDATE checklist_items SET meta_data = metadata'))
-                    conn.commit()
-                print("✓ Migrated metadata to meta_data in checklist_items table")
-        
-        # Check stakeholders table
-        if 'stakeholders' in inspector.get_table_names():
-            columns = [col['name'] for col in inspector.get_columns('stakeholders')]
+        # SQLite doesn't support RENAME COLUMN directly, so add meta_data and copy data
+        for table_name in ('checklist_items', 'stakeholders'):
+            if table_name not in existing_tables:
+                continue
+            columns = [col['name'] for col in inspector.get_columns(table_name)]
             if 'metadata' in columns and 'meta_data' not in columns:
-                with engine.connect() as conn:
-                    conn.execute(text('ALTER TABLE stakeholders ADD COLUMN meta_data TEXT'))
-                    conn.execute(text('UPDATE stakeholders SET meta_data = metadata'))
-                    conn.commit()
-                print("✓ Migrated metadata to meta_data in stakeholders table")
+                with engine.begin() as conn:
+                    conn.execute(text(f'ALTER TABLE {table_name} ADD COLUMN meta_data TEXT'))
+                    conn.execute(text(f'UPDATE {table_name} SET meta_data = metadata'))
+                print(f"✓ Migrated metadata to meta_data in {table_name} table")
         
         # Ensure all new tables are created
-        tables_to_create = ['stories', 'checklist_items', 'release_reports', 'stakeholders', 'backlog_health']
-        existing_tables = inspector.get_table_names()
+        tables_to_create = ['stories', 'checklist_items', 'release_reports', 'stakeholders', 'backlog_health', 'break_customizations']
         
         for table_name in tables_to_create:
             if table_name not in existing_tables:
@@ -186,47 +296,25 @@ def init_db():
         # Migrate stories table to add new columns if they don't exist
         if 'stories' in existing_tables:
             stories_columns = [col['name'] for col in inspector.get_columns('stories')]
+            new_columns = [
+                ('confidence', 'REAL'),
+                ('story_points', 'INTEGER'),
+                ('product', 'TEXT'),
+                ('sort_ranking', 'INTEGER'),
+            ]
+            missing_columns = [(name, col_type) for name, col_type in new_columns if name not in stories_columns]
             
-            # Add confidence column
-            if 'confidence' not in stories_columns:
-                try:
-                    with engine.connect() as conn:
-                        conn.execute(text('ALTER TABLE stories ADD COLUMN confidence REAL'))
-                        conn.commit()
-                    print("✓ Added confidence column to stories table")
-                except Exception as e:
-                    print(f"⚠ Could not add confidence column: {str(e)}")
-            
-            # Add story_points column
-            if 'story_points' not in stories_columns:
-                try:
-                    with engine.connect() as conn:
-                        conn.execute(text('ALTER TABLE stories ADD COLUMN story_points INTEGER'))
-                        conn.commit()
-                    print("✓ Added story_points column to stories table")
-                except Exception as e:
-                    print(f"⚠ Could not add story_points column: {str(e)}")
-            
-            # Add product column
-            if 'product' not in stories_columns:
+            # Add all missing columns in a single transaction (one commit)
+            if missing_columns:
                 try:
-                    with engine.connect() as conn:
-                        conn.execute(text('ALTER TABLE stories ADD COLUMN product TEXT'))
-                        conn.commit()
-                    print("✓ Added product column to stories table")
+                    with engine.begin() as conn:
+                        for name, col_type in missing_columns:
+                            conn.execute(text(f'ALTER TABLE stories ADD COLUMN {name} {col_type}'))
+                    print(f"✓ Added {', '.join(name for name, _ in missing_columns)} column(s) to stories table")
                 except Exception as e:
-                    print(f"⚠ Could not add product column: {str(e)}")
-            
-            # Add sort_ranking column
-            if 'sort_ranking' not in stories_columns:
-                try:
-                    with engine.connect() as conn:
-                        conn.execute(text('ALTER TABLE stories ADD COLUMN sort_ranking INTEGER'))
-                        conn.commit()
-                    print("✓ Added sort_ranking column to stories table")
-                except Exception as e:
-                    print(f"⚠ Could not add sort_ranking column: {str(e)}")
+                    print(f"⚠ Could not add stories columns: {str(e)}")
         
+        _set_schema_version(CURRENT_SCHEMA_VERSION)
         print("✓ Database initialization complete")
         
     except Exception as e:
@@ -245,3 +333,18 @@ def get_db():
     finally:
         db.close()
 
+
+def get_read_db():
+    """Get a database session for read-only endpoints.
+    
+    Each request gets its own session: async handlers use it on the event
+    loop while FastAPI runs this dependency on threadpool threads, so a
+    thread-local session could be shared by concurrent requests.
+    Never commit through this session.
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
@@ -1,8 +1,40 @@
 """Main FastAPI application for Serenity backend."""
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
+from fastapi.staticfiles import StaticFiles
+import hashlib
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from config import get_settings
 from database import init_db
-from routes import auth, serenity
+from routes import auth, serenity, wellness, audio, breaks, checklist, automation, twilio
+from routes.audio import PUBLIC_DIR, STATIC_AUDIO_PATH
+
+logger = logging.getLogger(__name__)
+
+
+def configure_logging() -> QueueListener:
+    """Route log records through a queue so logging calls never block on stdout.
+    
+    Handlers only enqueue; a listener thread does the actual writes. The level
+    comes from the LOG_LEVEL setting, so production can quiet pipeline output.
+    """
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    
+    root_logger = logging.getLogger()
+    root_logger.setLevel(get_settings().log_level.upper())
+    root_logger.addHandler(QueueHandler(log_queue))
+    
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+log_listener = configure_logging()
 
 # Initialize database
 init_db()
@@ -11,7 +43,8 @@ init_db()
 app = FastAPI(
     title="Serenity API",
     description="Backend API for Serenity - Break scheduling and wellness",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse  # orjson serializes much faster than stdlib json
 )
 
 # Configure CORS
@@ -19,59 +52,59 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
+    allow_headers=["Authorization", "Content-Type", "X-Requested-With"],
+    max_age=86400,  # Let browsers cache preflight results for a day
 )
 
+
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    """Turn any uncaught error into a JSON 500 so routes don't each need a try/except wrapper."""
+    logger.exception("Unhandled error on %s %s", request.method, request.url.path, exc_info=exc)
+    # Keep internals (SQL, paths, token errors) in the log, not the response
+    return ORJSONResponse({"detail": "Internal server error"}, status_code=500)
+
 # Include routers
 # Auth routes at /auth/* to match OAuth app redirect URIs
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(serenity.router, prefix="/api/serenity", tags=["serenity"])
-
-# Import and include wellness router
-from routes import wellness
 app.include_router(wellness.router, prefix="/api/wellness", tags=["wellness"])
-
-# Import and include audio router
-from routes import audio
 app.include_router(audio.router, prefix="/api/audio", tags=["audio"])
-
-# Import and include breaks router
-from routes import breaks
 app.include_router(breaks.router, prefix="/api/breaks", tags=["breaks"])
-
-# Import and include checklist router
-from routes import checklist
 app.include_router(checklist.router, prefix="/api/checklist", tags=["checklist"])
-
-# Import and include automation router
-from routes import automation
 app.include_router(automation.router, prefix="/api/automation", tags=["automation"])
-
-# Import and include Twilio router (server-side call initiation)
-from routes import twilio
+# Server-side call initiation
 app.include_router(twilio.router, prefix="/api/twilio", tags=["twilio"])
 
+# Raw sound files are served straight from public/ by StaticFiles
+app.mount(STATIC_AUDIO_PATH, StaticFiles(directory=PUBLIC_DIR, check_dir=True), name="audio_files")
 
-# Initialize automation scheduler
-try:
-    from utils.automation_scheduler import get_scheduler
-    scheduler = get_scheduler()
-    print("Automation scheduler initialized")
-except Exception as e:
-    print(f"Warning: Could not initialize automation scheduler: {str(e)}")
-    scheduler = None
+scheduler = None
 
 
-@app.get("/")
-async def root():
-    """Root endpoint - returns API info or HTML landing page."""
-    from fastapi.responses import HTMLResponse
-    from fastapi import Request
+@app.on_event("startup")
+def start_scheduler():
+    """Start the automation scheduler once the app is serving."""
+    global scheduler
     
-    # Check if client accepts HTML
-    # For browser requests, return HTML; for API clients, return JSON
-    return HTMLResponse(content="""
+    try:
+        from utils.automation_scheduler import get_scheduler
+        scheduler = get_scheduler()
+        logger.info("Automation scheduler initialized")
+    except Exception:
+        logger.warning("Could not initialize automation scheduler", exc_info=True)
+        scheduler = None
+
+
+@app.on_event("shutdown")
+def stop_log_listener():
+    """Flush queued log records before the process exits."""
+    log_listener.stop()
+
+
+# Landing page is static, so encode it and compute its ETag once at import
+_LANDING_HTML = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -167,7 +200,23 @@ async def root():
         </div>
     </body>
     </html>
-    """)
+    """.encode("utf-8")
+_LANDING_ETAG = f'"{hashlib.md5(_LANDING_HTML).hexdigest()}"'
+_ROOT_INFO = {"name": "Serenity API", "version": "1.0.0", "docs": "/docs"}
+
+
+@app.get("/")
+async def root(request: Request):
+    """Root endpoint - returns API info or HTML landing page."""
+    # curl, health checkers and monitoring pingers don't ask for HTML, so
+    # give them the small JSON body instead of the landing page
+    if "text/html" not in request.headers.get("accept", ""):
+        return ORJSONResponse(_ROOT_INFO, headers={"Vary": "Accept"})
+    
+    headers = {"ETag": _LANDING_ETAG, "Cache-Control": "public, max-age=3600", "Vary": "Accept"}
+    if request.headers.get("if-none-match") == _LANDING_ETAG:
+        return Response(status_code=304, headers=headers)
+    return Response(content=_LANDING_HTML, media_type="text/html", headers=headers)
 
 
 @app.get("/api/health")
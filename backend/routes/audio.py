@@ -1,20 +1,26 @@
 """Audio routes for serving sound files from public folder."""
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import FileResponse, Response
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from functools import lru_cache
 from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
 import os
+import re
 
 router = APIRouter()
 
 # Path to public folder (parent directory's public folder)
 # backend/routes/audio.py -> backend -> root -> public
-BASE_DIR = Path(__file__).parent.parent.parent
-PUBLIC_DIR = BASE_DIR / "public"
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
-# Ensure public directory exists
-if not PUBLIC_DIR.exists():
-    # Try alternative path (if running from different location)
-    PUBLIC_DIR = Path(__file__).parent.parent.parent.parent / "public"
+# Resolve to a canonical absolute path once, trying the alternative location
+# (if running from a different layout), and fail at startup if neither exists
+for _candidate in (BASE_DIR / "public", BASE_DIR.parent / "public"):
+    if _candidate.is_dir():
+        PUBLIC_DIR = _candidate.resolve(strict=True)
+        break
+else:
+    raise RuntimeError(f"public/ folder not found next to {BASE_DIR}")
 
 # Theme to sound file mapping
 THEME_SOUND_MAP = {
@@ -24,151 +30,290 @@ THEME_SOUND_MAP = {
     'wind': 'windchimes.mp3',
 }
 
+# URL path where main.py mounts public/ with StaticFiles
+STATIC_AUDIO_PATH = "/api/audio/files"
 
-@router.get("/preview/{theme_id}")
-async def get_sound_preview(theme_id: str):
-    """Get sound preview file for a theme from public folder."""
-    try:
-        # Get sound file name for theme
-        sound_file = THEME_SOUND_MAP.get(theme_id, 'oceanwaves.mp3')
-        sound_path = PUBLIC_DIR / sound_file
-        
-        if not sound_path.exists():
-            raise HTTPException(
-                status_code=404,
-                detail=f"Sound file not found: {sound_file}"
-            )
-        
-        # Determine media type based on file extension
-        media_type = "audio/mpeg" if sound_file.endswith('.mp3') else "audio/wav"
-        
-        return FileResponse(
-            sound_path,
+# Event type to sound file mapping
+EVENT_SOUND_MAP = {
+    'startup': 'startup_sound.wav',
+    'error': 'error_sound.wav',
+    'accept': 'accept_sound.wav',
+}
+
+
+def _media_type(sound_file: str) -> str:
+    """Get the media type for a sound file from its extension."""
+    return "audio/mpeg" if sound_file.endswith('.mp3') else "audio/wav"
+
+
+# Preview and chime audio never changes at runtime, so let browsers keep it
+IMMUTABLE_CACHE_CONTROL = "public, max-age=86400, immutable"
+SOUND_CACHE_CONTROL = "public, max-age=86400"  # Cache for 24 hours
+
+# Files above this size are streamed from disk in chunks rather than held
+# in memory, so a large theme track doesn't pin megabytes per worker
+MAX_CACHED_SOUND_BYTES = 8 * 1024 * 1024
+
+# Chunk size when streaming a byte range of an uncached file
+RANGE_CHUNK_SIZE = 64 * 1024
+
+# Silent fallback for chimes with no sound file. Starlette doesn't mutate a
+# Response while sending it, so one instance can be returned for every miss.
+_EMPTY_CHIME = Response(content=b'', media_type="audio/mpeg", headers={"Cache-Control": "no-cache"})
+
+_RANGE_RE = re.compile(r"bytes=(\d*)-(\d*)$")
+
+# Resolved (path, media type, ETag, size, bytes) per theme and event, built once
+# so handlers do a dict lookup instead of touching the filesystem per request.
+# Bytes is None for files over MAX_CACHED_SOUND_BYTES, which are streamed
+# from disk instead. Missing files are left out. Call reload_audio_index()
+# after changing files in public/.
+RESOLVED_THEME: Dict[str, Tuple[Path, str, str, int, Optional[bytes]]] = {}
+RESOLVED_EVENT: Dict[str, Tuple[Path, str, str, int, Optional[bytes]]] = {}
+
+
+def _index_entry(sound_file: str) -> Optional[Tuple[Path, str, str, int, Optional[bytes]]]:
+    """Resolve and load a sound file, or None if it's missing."""
+    sound_path = PUBLIC_DIR / sound_file
+    if not sound_path.is_file():
+        return None
+    stat = sound_path.stat()
+    # Strong, since every response carries exactly these bytes; If-Range
+    # only accepts a strong validator
+    etag = f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+    data = sound_path.read_bytes() if stat.st_size <= MAX_CACHED_SOUND_BYTES else None
+    return sound_path, _media_type(sound_file), etag, stat.st_size, data
+
+
+def reload_audio_index():
+    """Rebuild the theme and event sound index from the public folder."""
+    # Themes share files (preview, chime and theme all serve the same track),
+    # so load each file once
+    loaded = {}
+    RESOLVED_THEME.clear()
+    RESOLVED_EVENT.clear()
+    for index, sound_map in ((RESOLVED_THEME, THEME_SOUND_MAP), (RESOLVED_EVENT, EVENT_SOUND_MAP)):
+        for key, sound_file in sound_map.items():
+            if sound_file not in loaded:
+                loaded[sound_file] = _index_entry(sound_file)
+            if loaded[sound_file] is not None:
+                index[key] = loaded[sound_file]
+
+
+def _theme_entry(theme_id: str) -> Optional[Tuple[Path, str, str, int, Optional[bytes]]]:
+    """Look up a theme's sound, falling back to ocean for unknown themes."""
+    if theme_id not in THEME_SOUND_MAP:
+        theme_id = 'ocean'
+    return RESOLVED_THEME.get(theme_id)
+
+
+reload_audio_index()
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Check whether the request's If-None-Match covers this ETag (weak comparison)."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    return any(
+        (tag[2:] if tag.startswith("W/") else tag) == opaque
+        for tag in (t.strip() for t in if_none_match.split(","))
+    )
+
+
+def _parse_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single-range Range header into inclusive (start, end).
+    
+    Returns None if the range is malformed or unsatisfiable. Multi-range
+    requests aren't supported and are treated as malformed.
+    """
+    match = _RANGE_RE.match(range_header.strip())
+    if not match or size == 0:
+        return None
+    
+    start, end = match.groups()
+    if not start:
+        # Suffix range: the last N bytes
+        if not end or int(end) == 0:
+            return None
+        return max(size - int(end), 0), size - 1
+    
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start > end:
+        return None
+    return start, end
+
+
+def _iter_file_range(sound_path: Path, start: int, end: int) -> Iterator[bytes]:
+    """Yield bytes start..end (inclusive) of a file in RANGE_CHUNK_SIZE chunks."""
+    with open(sound_path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(RANGE_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+@lru_cache(maxsize=64)
+def _raw_headers(etag: str, filename: str, cache_control: str) -> Tuple[Tuple[bytes, bytes], ...]:
+    """Encode the response headers for a sound file once per (file, filename, policy).
+    
+    The first two entries (cache-control, etag) are what a 304 carries.
+    """
+    return (
+        (b"cache-control", cache_control.encode("latin-1")),
+        (b"etag", etag.encode("latin-1")),
+        (b"content-disposition", f"inline; filename={filename}".encode("latin-1")),
+        (b"accept-ranges", b"bytes"),
+    )
+
+
+def _with_raw_headers(response: Response, raw_headers: Tuple[Tuple[bytes, bytes], ...]) -> Response:
+    """Append pre-encoded headers to a response."""
+    response.raw_headers.extend(raw_headers)
+    return response
+
+
+def _range_response(request: Request, entry: Tuple[Path, str, str, int, Optional[bytes]],
+                    raw_headers: Tuple[Tuple[bytes, bytes], ...]) -> Optional[Response]:
+    """Build a 206/416 response for a Range request, or None to serve the full file.
+    
+    Lets <audio> elements seek and start playback without downloading the
+    whole track.
+    """
+    range_header = request.headers.get("range")
+    if not range_header:
+        return None
+    
+    sound_path, media_type, etag, size, data = entry
+    
+    # If-Range needs a strong match (RFC 9110 13.1.5): a weak or different
+    # validator, or a date, means the client's copy may be stale
+    if_range = request.headers.get("if-range")
+    if if_range and if_range.strip() != etag:
+        return None
+    
+    byte_range = _parse_range(range_header, size)
+    if byte_range is None:
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    
+    start, end = byte_range
+    headers = {
+        "Content-Range": f"bytes {start}-{end}/{size}",
+        "Content-Length": str(end - start + 1),
+    }
+    if data is not None:
+        response = Response(content=data[start:end + 1], status_code=206, media_type=media_type, headers=headers)
+    else:
+        response = StreamingResponse(
+            _iter_file_range(sound_path, start, end),
+            status_code=206,
             media_type=media_type,
-            headers={
-                "Content-Disposition": f"inline; filename={sound_file}",
-                "Cache-Control": "public, max-age=3600"
-            }
+            headers=headers
         )
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"Error serving sound preview: {str(e)}")
+    return _with_raw_headers(response, raw_headers)
+
+
+def _sound_response(request: Request, entry: Tuple[Path, str, str, int, Optional[bytes]],
+                    filename: str, cache_control: str) -> Response:
+    """Serve a sound file, or an empty 304 if the client already has it.
+    
+    Small files are sent from memory; larger ones are streamed from disk
+    with FileResponse. Single byte ranges are answered with 206.
+    """
+    sound_path, media_type, etag, size, data = entry
+    raw_headers = _raw_headers(etag, filename, cache_control)
+    if _etag_matches(request, etag):
+        return _with_raw_headers(Response(status_code=304), raw_headers[:2])
+    
+    partial = _range_response(request, entry, raw_headers)
+    if partial is not None:
+        return partial
+    
+    if data is None:
+        # FileResponse only fills in stat headers (etag etc.) that aren't already set
+        return _with_raw_headers(FileResponse(sound_path, media_type=media_type), raw_headers)
+    return _with_raw_headers(Response(content=data, media_type=media_type), raw_headers)
+
+
+@router.get("/url/{theme_id}")
+async def get_theme_sound_url(theme_id: str):
+    """Get the static URL of a theme's sound file, so clients and CDNs can cache it by URL."""
+    entry = _theme_entry(theme_id)
+    
+    if entry is None:
         raise HTTPException(
-            status_code=500,
-            detail=f"Error serving sound preview: {str(e)}"
+            status_code=404,
+            detail=f"Sound file not found: {THEME_SOUND_MAP.get(theme_id, 'oceanwaves.mp3')}"
         )
+    
+    return {"url": f"{STATIC_AUDIO_PATH}/{entry[0].name}"}
+
+
+@router.get("/preview/{theme_id}")
+async def get_sound_preview(theme_id: str, request: Request):
+    """Get sound preview file for a theme from public folder."""
+    entry = _theme_entry(theme_id)
+    
+    if entry is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Sound file not found: {THEME_SOUND_MAP.get(theme_id, 'oceanwaves.mp3')}"
+        )
+    
+    return _sound_response(request, entry, entry[0].name, IMMUTABLE_CACHE_CONTROL)
 
 
 @router.get("/chime/{theme_id}")
-async def get_theme_chime(theme_id: str):
+async def get_theme_chime(theme_id: str, request: Request):
     """Get a short chime sound for theme selection feedback."""
-    try:
-        # Use the same sound file as preview, but play a short clip
-        # For now, just return the full file - frontend can handle clipping if needed
-        sound_file = THEME_SOUND_MAP.get(theme_id, 'oceanwaves.mp3')
-        sound_path = PUBLIC_DIR / sound_file
-        
-        if not sound_path.exists():
-            return Response(
-                content=b'',
-                media_type="audio/mpeg",
-                headers={"Cache-Control": "no-cache"}
-            )
-        
-        media_type = "audio/mpeg" if sound_file.endswith('.mp3') else "audio/wav"
-        
-        return FileResponse(
-            sound_path,
-            media_type=media_type,
-            headers={
-                "Content-Disposition": f"inline; filename={theme_id}_chime.mp3",
-                "Cache-Control": "public, max-age=3600"
-            }
-        )
-    except Exception as e:
-        print(f"Error serving chime: {str(e)}")
-        return Response(
-            content=b'',
-            media_type="audio/mpeg",
-            headers={"Cache-Control": "no-cache"}
-        )
+    # Use the same sound file as preview, but play a short clip
+    # For now, just return the full file - frontend can handle clipping if needed
+    entry = _theme_entry(theme_id)
+    
+    if entry is None:
+        return _EMPTY_CHIME
+    
+    return _sound_response(request, entry, f"{theme_id}_chime.mp3", IMMUTABLE_CACHE_CONTROL)
 
 
 @router.get("/theme/{theme_id}")
-async def get_theme_sound(theme_id: str):
+async def get_theme_sound(theme_id: str, request: Request):
     """Get the main theme sound file for background playback."""
-    try:
-        sound_file = THEME_SOUND_MAP.get(theme_id, 'oceanwaves.mp3')
-        sound_path = PUBLIC_DIR / sound_file
-        
-        if not sound_path.exists():
-            raise HTTPException(
-                status_code=404,
-                detail=f"Sound file not found: {sound_file}"
-            )
-        
-        media_type = "audio/mpeg" if sound_file.endswith('.mp3') else "audio/wav"
-        
-        return FileResponse(
-            sound_path,
-            media_type=media_type,
-            headers={
-                "Content-Disposition": f"inline; filename={sound_file}",
-                "Cache-Control": "public, max-age=86400"  # Cache for 24 hours
-            }
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"Error serving theme sound: {str(e)}")
+    entry = _theme_entry(theme_id)
+    
+    if entry is None:
         raise HTTPException(
-            status_code=500,
-            detail=f"Error serving theme sound: {str(e)}"
+            status_code=404,
+            detail=f"Sound file not found: {THEME_SOUND_MAP.get(theme_id, 'oceanwaves.mp3')}"
         )
+    
+    return _sound_response(request, entry, entry[0].name, SOUND_CACHE_CONTROL)
 
 
 @router.get("/event/{event_type}")
-async def get_event_sound(event_type: str):
+async def get_event_sound(event_type: str, request: Request):
     """Get event sound files (startup, error, accept)."""
-    try:
-        event_sound_map = {
-            'startup': 'startup_sound.wav',
-            'error': 'error_sound.wav',
-            'accept': 'accept_sound.wav',
-        }
-        
-        sound_file = event_sound_map.get(event_type)
-        if not sound_file:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Event sound not found: {event_type}"
-            )
-        
-        sound_path = PUBLIC_DIR / sound_file
-        
-        if not sound_path.exists():
-            raise HTTPException(
-                status_code=404,
-                detail=f"Sound file not found: {sound_file}"
-            )
-        
-        media_type = "audio/wav" if sound_file.endswith('.wav') else "audio/mpeg"
-        
-        return FileResponse(
-            sound_path,
-            media_type=media_type,
-            headers={
-                "Content-Disposition": f"inline; filename={sound_file}",
-                "Cache-Control": "public, max-age=86400"
-            }
+    sound_file = EVENT_SOUND_MAP.get(event_type)
+    if not sound_file:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Event sound not found: {event_type}"
         )
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"Error serving event sound: {str(e)}")
+    
+    entry = RESOLVED_EVENT.get(event_type)
+    
+    if entry is None:
         raise HTTPException(
-            status_code=500,
-            detail=f"Error serving event sound: {str(e)}"
+            status_code=404,
+            detail=f"Sound file not found: {sound_file}"
         )
-
+    
+    return _sound_response(request, entry, sound_file, SOUND_CACHE_CONTROL)
@@ -3,30 +3,56 @@ from fastapi import APIRouter, Request, HTTPException, Depends
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
 from database import get_db
-from utils.google_calendar import get_google_oauth_flow
-from utils.token_manager import save_token, get_token, delete_token
-from config import settings
+from utils.google_calendar import get_google_oauth_flow, get_google_user_info
+from utils.token_manager import save_token, get_tokens, delete_token, update_user_info
+from utils.userinfo_cache import get_cached_userinfo, set_cached_userinfo
+from config import get_settings
+import asyncio
+import logging
+from functools import lru_cache
 import requests
 from urllib.parse import urlencode
-from datetime import datetime
+from datetime import datetime, timedelta
 
 router = APIRouter()
 
+logger = logging.getLogger(__name__)
+
+# Pooled session so repeated Notion token exchanges reuse the TLS connection
+_notion_oauth_session = requests.Session()
+
+# How long to wait before retrying a userinfo lookup that returned nothing
+USERINFO_RECHECK_INTERVAL = timedelta(hours=1)
+
+# Frontend pages the OAuth callbacks redirect to on success
+GOOGLE_SUCCESS_REDIRECT = "http://localhost:3000/auth/callback?service=google&success=true"
+NOTION_SUCCESS_REDIRECT = "http://localhost:3000/auth/callback?service=notion&success=true"
+
+
+@lru_cache(maxsize=1)
+def get_notion_auth_url() -> str:
+    """Build the Notion authorization URL once; its inputs are fixed settings."""
+    settings = get_settings()
+    params = {
+        "client_id": settings.notion_client_id,
+        "redirect_uri": settings.notion_redirect_uri,
+        "response_type": "code",
+        "owner": "user",
+    }
+    return f"https://api.notion.com/v1/oauth/authorize?{urlencode(params)}"
+
 
 @router.get("/google")
 async def google_auth(request: Request):
     """Initiate Google OAuth flow."""
-    try:
-        flow = get_google_oauth_flow()
-        authorization_url, state = flow.authorization_url(
-            access_type='offline',
-            include_granted_scopes='true',
-            prompt='consent'
-        )
-        # Store state in session or return it to frontend
-        return {"authorization_url": authorization_url, "state": state}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error initiating Google OAuth: {str(e)}")
+    flow = get_google_oauth_flow()
+    authorization_url, state = flow.authorization_url(
+        access_type='offline',
+        include_granted_scopes='true',
+        prompt='consent'
+    )
+    # Store state in session or return it to frontend
+    return {"authorization_url": authorization_url, "state": state}
 
 
 @router.get("/google/callback")
@@ -35,59 +61,43 @@ async def google_callback(request: Request, code: str = None, state: str = None,
     if not code:
         raise HTTPException(status_code=400, detail="Authorization code not provided")
     
+    flow = get_google_oauth_flow(state)
+    # Token exchange and userinfo are blocking HTTP calls, keep them off the event loop
+    await asyncio.to_thread(flow.fetch_token, code=code)
+    credentials = flow.credentials
+    
+    # Calculate expires_in in seconds
+    expires_in = None
+    if credentials.expiry:
+        expires_in = int((credentials.expiry - datetime.utcnow()).total_seconds())
+    
+    # Fetch user info from Google
+    user_info = None
     try:
-        flow = get_google_oauth_flow(state)
-        flow.fetch_token(code=code)
-        credentials = flow.credentials
-        
-        # Calculate expires_in in seconds
-        expires_in = None
-        if credentials.expiry:
-            expires_in = int((credentials.expiry - datetime.utcnow()).total_seconds())
-        
-        # Fetch user info from Google
-        user_info = None
-        try:
-            from googleapiclient.discovery import build
-            service = build('oauth2', 'v2', credentials=credentials)
-            user_info = service.userinfo().get().execute()
-            print(f"Successfully fetched user info: {user_info.get('given_name', 'N/A')} ({user_info.get('email', 'N/A')})")
-        except Exception as e:
-            print(f"Error fetching user info in callback: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            # Continue even if user info fetch fails - tokens are still saved
-        
-        # Save tokens to database
-        save_token(
-            db=db,
-            service="google",
-            access_token=credentials.token,
-            refresh_token=credentials.refresh_token,
-            expires_in=expires_in,
-            user_info=user_info  # Pass user info to save_token
-        )
-        
-        # Redirect to frontend with success
-        return RedirectResponse(url=f"http://localhost:3000/auth/callback?service=google&success=true")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error completing Google OAuth: {str(e)}")
+        user_info = await asyncio.to_thread(get_google_user_info, credentials.token)
+        logger.debug("Fetched user info: %s (%s)", user_info.get('given_name', 'N/A'), user_info.get('email', 'N/A'))
+    except Exception:
+        logger.exception("Error fetching user info in callback")
+        # Continue even if user info fetch fails - tokens are still saved
+    
+    # Save tokens to database
+    save_token(
+        db=db,
+        service="google",
+        access_token=credentials.token,
+        refresh_token=credentials.refresh_token,
+        expires_in=expires_in,
+        user_info=user_info  # Pass user info to save_token
+    )
+    
+    # Redirect to frontend with success
+    return RedirectResponse(url=GOOGLE_SUCCESS_REDIRECT)
 
 
 @router.get("/notion")
 async def notion_auth(request: Request):
     """Initiate Notion OAuth flow."""
-    try:
-        params = {
-            "client_id": settings.notion_client_id,
-            "redirect_uri": settings.notion_redirect_uri,
-            "response_type": "code",
-            "owner": "user",
-        }
-        authorization_url = f"https://api.notion.com/v1/oauth/authorize?{urlencode(params)}"
-        return {"authorization_url": authorization_url}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error initiating Notion OAuth: {str(e)}")
+    return {"authorization_url": get_notion_auth_url()}
 
 
 @router.get("/notion/callback")
@@ -99,46 +109,46 @@ async def notion_callback(request: Request, code: str = None, error: str = None,
     if not code:
         raise HTTPException(status_code=400, detail="Authorization code not provided")
     
-    try:
-        # Exchange code for access token
-        token_url = "https://api.notion.com/v1/oauth/token"
-        data = {
-            "grant_type": "authorization_code",
-            "code": code,
-            "redirect_uri": settings.notion_redirect_uri,
-        }
-        auth = (settings.notion_client_id, settings.notion_client_secret)
-        
-        response = requests.post(token_url, data=data, auth=auth)
-        response.raise_for_status()
-        
-        token_data = response.json()
-        access_token = token_data.get("access_token")
-        
-        # Save token to database
-        save_token(
-            db=db,
-            service="notion",
-            access_token=access_token,
-            refresh_token=None,  # Notion doesn't provide refresh tokens in the same way
-            expires_in=None
-        )
-        
-        # Redirect to frontend with success
-        return RedirectResponse(url=f"http://localhost:3000/auth/callback?service=notion&success=true")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error completing Notion OAuth: {str(e)}")
+    # Exchange code for access token
+    settings = get_settings()
+    token_url = "https://api.notion.com/v1/oauth/token"
+    data = {
+        "grant_type": "authorization_code",
+        "code": code,
+        "redirect_uri": settings.notion_redirect_uri,
+    }
+    auth = (settings.notion_client_id, settings.notion_client_secret)
+    
+    # Blocking HTTP call - run it in a worker thread so the event loop keeps serving
+    response = await asyncio.to_thread(
+        _notion_oauth_session.post, token_url, data=data, auth=auth, timeout=10
+    )
+    response.raise_for_status()
+    
+    token_data = response.json()
+    access_token = token_data.get("access_token")
+    
+    # Save token to database
+    save_token(
+        db=db,
+        service="notion",
+        access_token=access_token,
+        refresh_token=None,  # Notion doesn't provide refresh tokens in the same way
+        expires_in=None
+    )
+    
+    # Redirect to frontend with success
+    return RedirectResponse(url=NOTION_SUCCESS_REDIRECT)
 
 
 @router.get("/status")
 async def auth_status(db: Session = Depends(get_db)):
     """Check OAuth connection status for Google and Notion."""
-    import json
     from utils.google_calendar import get_credentials_from_token, refresh_credentials_if_needed
-    from googleapiclient.discovery import build
     
-    google_token = get_token(db, "google")
-    notion_token = get_token(db, "notion")
+    tokens = get_tokens(db, ["google", "notion"])
+    google_token = tokens.get("google")
+    notion_token = tokens.get("notion")
     
     google_status = {"connected": google_token is not None}
     user_info = None
@@ -147,54 +157,54 @@ async def auth_status(db: Session = Depends(get_db)):
     if google_token:
         try:
             # Try to get user info from database first
-            if hasattr(google_token, 'user_info') and google_token.user_info:
-                try:
-                    user_info = json.loads(google_token.user_info)
-                    print(f"Loaded user info from database: {user_info.get('given_name', 'N/A')}")
-                except json.JSONDecodeError as e:
-                    print(f"Error parsing user_info from database: {str(e)}")
-                    user_info = None
+            if isinstance(google_token.user_info, dict) and google_token.user_info:
+                user_info = google_token.user_info
+                logger.debug("Loaded user info from database: %s", user_info.get('given_name', 'N/A'))
+            
+            # A recent lookup (successful or not) for this token skips the Google call
+            cached_user_info = None if user_info else get_cached_userinfo(google_token.access_token)
+            if cached_user_info is not None:
+                user_info = cached_user_info or None
+            
+            # So does a recorded lookup attempt (shared across workers/restarts)
+            elif not user_info and google_token.userinfo_checked_at and \
+                    datetime.utcnow() - google_token.userinfo_checked_at < USERINFO_RECHECK_INTERVAL:
+                logger.debug("User info looked up recently, not retrying yet")
             
             # If no user info in database, fetch from Google API
-            if not user_info:
-                print("User info not in database, fetching from Google API...")
+            elif not user_info:
+                logger.debug("User info not in database, fetching from Google API")
                 try:
                     creds = get_credentials_from_token(google_token.access_token, google_token.refresh_token)
-                    creds, _ = refresh_credentials_if_needed(creds)
-                    service = build('oauth2', 'v2', credentials=creds)
-                    user_info = service.userinfo().get().execute()
-                    print(f"Fetched user info from Google: {user_info.get('given_name', 'N/A')}")
+                    creds, _ = await asyncio.to_thread(refresh_credentials_if_needed, creds)
+                    user_info = await asyncio.to_thread(get_google_user_info, creds.token)
+                    logger.debug("Fetched user info from Google: %s", user_info.get('given_name', 'N/A'))
+                    set_cached_userinfo(google_token.access_token, user_info)
                     
                     # Save user info to database
-                    if user_info:
-                        try:
-                            from utils.token_manager import save_token
-                            save_token(
-                                db=db,
-                                service="google",
-                                access_token=google_token.access_token,
-                                refresh_token=google_token.refresh_token,
-                                expires_in=None,
-                                user_info=user_info
-                            )
-                            print("Saved user info to database")
-                        except Exception as save_error:
-                            print(f"Error saving user info to database: {str(save_error)}")
+                    try:
+                        update_user_info(db, google_token, user_info)
+                        logger.debug("Saved user info to database")
+                    except Exception:
+                        logger.exception("Error saving user info to database")
                 except Exception as api_error:
+                    set_cached_userinfo(google_token.access_token, None)
                     error_msg = str(api_error)
-                    print(f"Error fetching user info from Google API: {error_msg}")
+                    
+                    # Record the attempt so other workers don't retry on every poll
+                    try:
+                        update_user_info(db, google_token)
+                    except Exception:
+                        logger.exception("Error recording user info lookup")
                     
                     # Check if error is due to insufficient scopes
                     if "insufficient" in error_msg.lower() or "scope" in error_msg.lower() or "403" in error_msg:
-                        print("NOTE: Token doesn't have userinfo scopes. User needs to re-authenticate to get first name.")
-                        print("This is normal if user authenticated before we added userinfo scopes.")
+                        # Normal if the user authenticated before we added userinfo scopes
+                        logger.info("Google token lacks userinfo scopes; user needs to re-authenticate to get first name")
                     else:
-                        import traceback
-                        traceback.print_exc()
-        except Exception as e:
-            print(f"Error in auth_status: {str(e)}")
-            import traceback
-            traceback.print_exc()
+                        logger.exception("Error fetching user info from Google API")
+        except Exception:
+            logger.exception("Error in auth_status")
         
         # Always include user info if we have it
         if user_info:
@@ -205,9 +215,10 @@ async def auth_status(db: Session = Depends(get_db)):
                 "email": user_info.get("email", ""),
                 "picture": user_info.get("picture", "")
             }
-            print(f"✓ Returning user info: given_name='{google_status['user'].get('given_name')}', name='{google_status['user'].get('name')}'")
+            logger.debug("Returning user info: given_name=%r, name=%r",
+                         google_status['user'].get('given_name'), google_status['user'].get('name'))
         else:
-            print("⚠ No user info available - user may need to re-authenticate to get new scopes")
+            logger.debug("No user info available - user may need to re-authenticate to get new scopes")
     
     return {
         "google": google_status,
@@ -1,14 +1,24 @@
 """Automation routes for triggering the complete PM workflow pipeline."""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator, Awaitable
+import asyncio
+import logging
+import orjson
+import requests
 import time
-import json
-from datetime import datetime
-from database import get_db
+from google.api_core.exceptions import GoogleAPIError
+from datetime import datetime, timedelta
+from database import get_db, SessionLocal, Story, ChecklistItem
 from utils.token_manager import get_token
-from utils.notion import get_notion_pages
+from utils.notion import get_notion_pages_cached, get_page_contents
+from utils.notion_page_cache import clear_page_cache
+from utils.notion_reports import create_report_page_shell, create_comprehensive_report_page, create_backlog_database_entries, story_report_fields
 from utils.google_calendar import get_upcoming_events
+from utils.agents.sprint_planning_agent import format_stories_for_sprint
 from utils.agents import (
     StoryExtractionAgent,
     CustomerResearchAgent,
@@ -19,8 +29,24 @@ from utils.agents import (
     SprintPlanningAgent
 )
 
+logger = logging.getLogger(__name__)
+
+# Prefix for pipeline progress lines, so one run's log lines are easy to pick out
+LOG_PREFIX = "[Meeting Ended Pipeline] "
+
 router = APIRouter()
 
+# Failures an agent can hit talking to Notion, Gemini or the database, or parsing
+# their responses. Anything else is a bug and should surface, not become an error output.
+AGENT_ERRORS = (
+    requests.RequestException,
+    GoogleAPIError,
+    SQLAlchemyError,
+    ValueError,  # includes json.JSONDecodeError
+    KeyError,
+    RuntimeError,
+)
+
 
 def clear_automation_states(db: Session, user_id: str = "default"):
     """Clear automation states before starting a new automation run.
@@ -35,61 +61,661 @@ def clear_automation_states(db: Session, user_id: str = "default"):
         db: Database session
         user_id: User identifier
     """
-    from database import Story, ChecklistItem
-    from datetime import datetime, timedelta
-    
-    print("[Meeting Ended Pipeline] Clearing automation states...")
+    logger.info("%sClearing automation states...", LOG_PREFIX)
     
     # Archive or delete stories from previous automation runs to prevent accumulation
     # This ensures each automation run starts fresh and doesn't accumulate stories across runs
     try:
         # Archive stories that are pending or approved (from previous runs)
-        # We'll archive them so they're not considered in duplicate detection
-        stories_to_archive = db.query(Story).filter(
+        # We'll archive them so they're not considered in duplicate detection.
+        # One bulk UPDATE; nothing needs the rows loaded.
+        archived_count = db.query(Story).filter(
             Story.user_id == user_id,
             Story.status.in_(["pending", "approved"])
-        ).all()
+        ).update({Story.status: "archived"}, synchronize_session=False)
         
-        if stories_to_archive:
-            archived_count = 0
-            for story in stories_to_archive:
-                # Archive the story so it's not considered in new runs
-                story.status = "archived"
-                archived_count += 1
-            
+        if archived_count:
             db.commit()
-            print(f"[Meeting Ended Pipeline] Archived {archived_count} stories from previous runs")
+            logger.info("%sArchived %d stories from previous runs", LOG_PREFIX, archived_count)
         else:
-            print("[Meeting Ended Pipeline] No stories to archive")
+            logger.info("%sNo stories to archive", LOG_PREFIX)
             
-    except Exception as e:
-        print(f"[Meeting Ended Pipeline] Error archiving stories: {str(e)}")
+    except SQLAlchemyError as e:
+        logger.error("%sError archiving stories: %s", LOG_PREFIX, e)
         db.rollback()
         # Continue even if archiving fails
     
     # Clear any pending checklist items from previous automation runs
     # Keep resolved items for history, but clear pending ones to avoid confusion
     try:
-        old_pending_items = db.query(ChecklistItem).filter(
+        cleared_count = db.query(ChecklistItem).filter(
             ChecklistItem.user_id == user_id,
             ChecklistItem.status == "pending",
             ChecklistItem.type.in_(["story_approval", "backlog_cleanup", "release_report"])
-        ).all()
+        ).delete(synchronize_session=False)
         
-        if old_pending_items:
-            for item in old_pending_items:
-                db.delete(item)
+        if cleared_count:
             db.commit()
-            print(f"[Meeting Ended Pipeline] Cleared {len(old_pending_items)} old pending checklist items")
-    except Exception as e:
-        print(f"[Meeting Ended Pipeline] Error clearing checklist items: {str(e)}")
+            logger.info("%sCleared %d old pending checklist items", LOG_PREFIX, cleared_count)
+    except SQLAlchemyError as e:
+        logger.error("%sError clearing checklist items: %s", LOG_PREFIX, e)
+        db.rollback()
+    
+    logger.info("%sState clearing complete - ready for fresh automation run", LOG_PREFIX)
+
+
+async def _arun_agent_in_own_session(agent_class, user_id: str, **kwargs) -> Dict[str, Any]:
+    """Run an agent with a dedicated DB session so agents can run concurrently."""
+    db = SessionLocal()
+    try:
+        return await agent_class(db, user_id).arun(**kwargs)
+    finally:
+        db.close()
+
+
+# IDs per IN (...) clause when loading stories, keeping each query's parameter list bounded
+STORY_FETCH_CHUNK_SIZE = 500
+
+
+def fetch_stories(db: Session, user_id: str, ids: List[str]) -> List[Story]:
+    """Load this user's active (pending or approved) stories with the given IDs.
+    
+    IDs are queried in chunks of STORY_FETCH_CHUNK_SIZE; order is not preserved.
+    """
+    stories = []
+    for i in range(0, len(ids), STORY_FETCH_CHUNK_SIZE):
+        chunk = ids[i:i + STORY_FETCH_CHUNK_SIZE]
+        stories.extend(db.scalars(
+            select(Story).where(
+                Story.user_id == user_id,
+                Story.id.in_(chunk),
+                Story.status.in_(["pending", "approved"])  # Only active stories
+            )
+        ))
+    return stories
+
+
+def _format_stories_for_sprint(stories: List[Story]) -> Optional[List[Dict]]:
+    """Turn this run's stories into sprint planning input, highest priority first.
+    
+    Returns:
+        List of story dicts, or None if the run extracted no stories
+    """
+    if not stories:
+        return None
+    
+    return format_stories_for_sprint(stories)
+
+
+# Most recent pages whose content is prefetched for the page-reading agents
+# (customer research and cross-team read 20, meeting insights 10)
+SHARED_CONTENT_PAGE_COUNT = 20
+
+# Output keys in pipeline order: story extraction first, then the parallel agents
+PIPELINE_OUTPUT_KEYS = (
+    "story_extraction",
+    "customer_research",
+    "backlog_grooming",
+    "cross_team_updates",
+    "meeting_insights",
+    "reporting",
+    "sprint_planning",
+)
+
+
+def _meeting_insights_metrics(data: Dict[str, Any]) -> Dict[str, int]:
+    """Summary metrics from meeting insights; falls back to counting the meetings list."""
+    meetings = data.get("meetings", [])
+    return {
+        "insights_generated": data.get("total_meetings", len(meetings)),
+        "action_items_total": data.get("total_action_items", 0) or sum(len(m.get("action_items", [])) for m in meetings),
+    }
+
+
+# Summary metrics each agent contributes, computed from its output when it succeeded.
+# Metrics reported by more than one agent (insights, action items) are summed.
+SUMMARY_EXTRACTORS = {
+    "story_extraction": lambda data: {
+        "stories_extracted": data.get("stories_extracted", 0) or len(data.get("stories", [])),
+    },
+    "backlog_grooming": lambda data: {
+        "duplicates_found": data.get("duplicate_count", len(data.get("duplicates", []))),
+    },
+    "meeting_insights": _meeting_insights_metrics,
+    "customer_research": lambda data: {
+        "insights_generated": len(data.get("customer_themes", [])),
+    },
+    "cross_team_updates": lambda data: {
+        "action_items_total": len(data.get("recommended_actions", [])),
+    },
+}
+
+SUMMARY_COUNTERS = (
+    "stories_extracted",
+    "duplicates_found",
+    "insights_generated",
+    "action_items_total",
+)
+
+
+def _summarize_agent_outputs(outputs: Dict[str, Any]) -> Dict[str, int]:
+    """Total up the summary counters from the successful agent outputs in a single pass."""
+    counts = dict.fromkeys(SUMMARY_COUNTERS, 0)
+    for output_key, extract in SUMMARY_EXTRACTORS.items():
+        data = outputs.get(output_key) or {}
+        if data.get("success"):
+            for name, value in extract(data).items():
+                counts[name] += value
+    return counts
+
+
+# Per-user results kept between runs (see _remember_for_user). Entries expire
+# after _run_result_ttl, and only the most recently stored users are kept, so
+# these stay small however many user IDs hit the endpoints. They're per process.
+_run_result_ttl = timedelta(hours=1)
+RUN_RESULT_MAX_USERS = 100
+
+
+def _recall_for_user(store: Dict[str, Tuple[Any, datetime]], user_id: str) -> Optional[Any]:
+    """Get a user's entry from a per-user run store if available and not expired."""
+    if user_id in store:
+        value, stored_at = store[user_id]
+        if datetime.utcnow() - stored_at < _run_result_ttl:
+            return value
+        # Remove expired entry
+        del store[user_id]
+    return None
+
+
+def _remember_for_user(store: Dict[str, Tuple[Any, datetime]], user_id: str, value: Any):
+    """Store a user's entry, dropping the least recently stored users past RUN_RESULT_MAX_USERS."""
+    # Re-insert so the dict's order is oldest-stored first
+    store.pop(user_id, None)
+    store[user_id] = (value, datetime.utcnow())
+    while len(store) > RUN_RESULT_MAX_USERS:
+        del store[next(iter(store))]
+
+
+# Agents whose output only changes when new stories are extracted
+STORY_DRIVEN_OUTPUT_KEYS = ("reporting", "sprint_planning")
+
+# Last successful story-driven outputs per user, reused by runs that extract no stories
+_last_story_outputs: Dict[str, Tuple[Dict[str, Dict[str, Any]], datetime]] = {}
+
+
+def _reusable_story_outputs(user_id: str, outputs: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Get the previous run's reporting/sprint outputs if this run found no new stories.
+    
+    Returns:
+        Dict of output key -> reused output (marked reused_from_previous_run), or {} to run the agents
+    """
+    story_extraction = outputs.get("story_extraction") or {}
+    # A failed extraction tells us nothing about new stories, so run the agents
+    if not story_extraction.get("success") or story_extraction.get("stories_extracted", 0):
+        return {}
+    previous = _recall_for_user(_last_story_outputs, user_id)
+    if not previous:
+        return {}
+    return {key: {**result, "reused_from_previous_run": True} for key, result in previous.items()}
+
+
+def _remember_story_outputs(user_id: str, outputs: Dict[str, Any]):
+    """Keep this run's freshly computed reporting/sprint outputs for later no-story runs."""
+    fresh = {
+        key: outputs[key] for key in STORY_DRIVEN_OUTPUT_KEYS
+        if (outputs.get(key) or {}).get("success") and not outputs[key].get("reused_from_previous_run")
+    }
+    if len(fresh) == len(STORY_DRIVEN_OUTPUT_KEYS):
+        _remember_for_user(_last_story_outputs, user_id, fresh)
+
+
+def _start_report_page(
+    access_token: str,
+    parent_page_id: str,
+    meeting_name: str,
+    meeting_date: str,
+    auto_approved_stories: List[Dict[str, Any]]
+) -> Tuple[Optional[Dict], Optional[Dict]]:
+    """Create the (still empty) report page, then the Backlog entries that link to it.
+    
+    Neither needs the agents' outputs, so this runs while the agents do. It
+    works from story dicts and doesn't touch the database; the pipeline saves
+    the returned Backlog page IDs with _save_notion_page_ids.
+    
+    Returns:
+        Tuple of (report page, Backlog entries result); either may be None
+    """
+    report_page = create_report_page_shell(access_token, parent_page_id, meeting_name, meeting_date)
+    if not report_page:
+        logger.warning("Failed to create report page")
+        return None, None
+    
+    # The new report page changes the workspace's page listing
+    clear_page_cache(access_token)
+    logger.info("Created report page: %s", report_page["url"])
+    
+    # Create backlog database entries for auto-approved stories
+    database_entries_result = None
+    if auto_approved_stories:
+        database_entries_result = create_backlog_database_entries(
+            access_token=access_token,
+            stories=auto_approved_stories,
+            report_page_url=report_page["url"]
+        )
+        
+        if database_entries_result.get("success"):
+            logger.info("Created %s stories in Backlog database", database_entries_result.get("created_count", 0))
+        else:
+            logger.warning("Database entries creation had issues: %s", database_entries_result.get("error", "Unknown error"))
+    return report_page, database_entries_result
+
+
+def _save_notion_page_ids(db: Session, stories: List[Story], notion_page_ids: Dict[str, str]):
+    """Record the Backlog page created for each story and commit.
+    
+    Blocking DB work - the pipeline runs it with asyncio.to_thread.
+    """
+    for story in stories:
+        if story.id in notion_page_ids:
+            story.notion_page_id = notion_page_ids[story.id]
+    try:
+        db.commit()
+    except SQLAlchemyError as e:
+        logger.error("Error saving Backlog page IDs: %s", e)
         db.rollback()
+
+
+# Latest report page result per user, for callers that got report_status "pending"
+_last_reports: Dict[str, Tuple[Dict[str, Any], datetime]] = {}
+
+
+async def _finish_report(
+    user_id: str,
+    access_token: str,
+    parent_page_id: str,
+    meeting_name: str,
+    meeting_date: str,
+    outputs: Dict[str, Any],
+    stories: List[Dict[str, Any]],
+    report_page: Dict,
+    database_entries_result: Optional[Dict]
+) -> Optional[Dict]:
+    """Fill in the report page content from the agents' outputs and record the result.
+    
+    The result is recorded however this ends, so /last-report never stays "pending".
+    
+    Args:
+        stories: Story dicts from story_report_fields
+        report_page: Page from create_report_page_shell
+        database_entries_result: Backlog entries result, recorded alongside the page
+    
+    Returns:
+        Report page data, or None if filling it in failed
+    """
+    report_page_data = None
+    try:
+        report_page_data = await asyncio.to_thread(
+            create_comprehensive_report_page,
+            access_token=access_token,
+            parent_page_id=parent_page_id,
+            meeting_name=meeting_name,
+            meeting_date=meeting_date,
+            agent_outputs=outputs,
+            stories=stories,
+            report_page=report_page
+        )
+        if report_page_data:
+            logger.info("Created comprehensive report page: %s", report_page_data.get("url", ""))
+    except AGENT_ERRORS:
+        logger.exception("Error filling in Notion report page")
+        # Continue even if report creation fails
+    finally:
+        _remember_for_user(_last_reports, user_id, {
+            "status": "created" if report_page_data else "failed",
+            "report_page": report_page_data,
+            "database_entries": database_entries_result
+        })
+    return report_page_data
+
+
+async def safe_run(name: str, agent_run: Awaitable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Await an agent run, turning an expected failure into an error output.
+    
+    Only AGENT_ERRORS are caught; anything else is a bug and propagates.
+    """
+    try:
+        return await agent_run
+    except AGENT_ERRORS as e:
+        logger.exception("Agent %s failed", name)
+        return {"success": False, "error": str(e)}
+
+
+async def _run_agent_job(output_key: str, agent_class, user_id: str, kwargs: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """Run one parallel agent in its own session.
     
-    print("[Meeting Ended Pipeline] State clearing complete - ready for fresh automation run")
+    Returns:
+        Tuple of (output_key, agent output)
+    """
+    return output_key, await safe_run(output_key, _arun_agent_in_own_session(agent_class, user_id, **kwargs))
+
+
+def _start_pipeline_run(db: Session, user_id: str):
+    """Clear state from previous runs and load the tokens the pipeline needs.
+    
+    Blocking DB work - the endpoints run it with asyncio.to_thread.
+    
+    Returns:
+        Tuple of (notion_token, google_token); google_token may be None
+    
+    Raises:
+        HTTPException: 400 if Notion isn't connected
+    """
+    # Clear automation states before starting
+    clear_automation_states(db, user_id)
+    
+    # Get tokens
+    notion_token = get_token(db, "notion")
+    google_token = get_token(db, "google")
+    
+    if not notion_token:
+        raise HTTPException(
+            status_code=400,
+            detail="Notion not connected. Please connect your Notion account first."
+        )
+    return notion_token, google_token
+
+
+async def _run_pipeline(
+    db: Session,
+    user_id: str,
+    notion_token,
+    google_token,
+    start_time: float,
+    background_tasks: Optional[BackgroundTasks] = None
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """Run the meeting ended pipeline, yielding (event, data) as each stage finishes.
+    
+    Yields an "agent" event per agent output as it completes, then a final
+    "complete" event carrying the full response (outputs, summary, report page).
+    
+    If background_tasks is given, the report page content is filled in after the
+    response is sent: the response has report_status "pending" and no report
+    page (the Backlog entries are still included), and /last-report has the
+    result once it's done.
+    """
+    # One start time for the run, so the agents share one current-run window
+    run_started_at = datetime.utcnow()
+    # Read the token once: the agents run on worker threads with their own
+    # sessions, so they take the plain string rather than this session's row
+    notion_access_token = notion_token.access_token
+    
+    # Fetch recent data - Notion and Calendar are independent, so fetch them concurrently
+    logger.info("%sFetching data...", LOG_PREFIX)
+    fetch_notion = asyncio.to_thread(
+        get_notion_pages_cached, notion_access_token, page_size=100, include_archived=False
+    )
+    if google_token:
+        fetch_events = asyncio.to_thread(
+            get_upcoming_events,
+            google_token.access_token,
+            google_token.refresh_token,
+            max_results=50
+        )
+        notion_pages, events_result = await asyncio.gather(fetch_notion, fetch_events, return_exceptions=True)
+    else:
+        notion_pages, events_result = await fetch_notion, None
+    
+    if isinstance(notion_pages, Exception):
+        raise notion_pages
+    
+    events = None
+    if isinstance(events_result, Exception):
+        logger.warning("Could not fetch Google Calendar events: %s", events_result)
+    elif events_result:
+        events, _ = events_result
+    
+    logger.info("%sFetched %d pages and %d events", LOG_PREFIX, len(notion_pages), len(events) if events else 0)
+    
+    # The page-reading agents each look at the most recent pages; fetch that
+    # content once, in the background while story extraction runs, and share it
+    prefetch_page_contents = asyncio.create_task(asyncio.to_thread(
+        get_page_contents,
+        notion_access_token,
+        [page.get("id") for page in notion_pages[:SHARED_CONTENT_PAGE_COUNT]]
+    ))
+    
+    logger.info("%sRunning agents...", LOG_PREFIX)
+    
+    # Pre-seed the keys so outputs keeps pipeline order however the agents finish
+    outputs = {key: None for key in PIPELINE_OUTPUT_KEYS}
+    
+    # 0. Story Extraction (must run first to extract stories from meeting notes)
+    # Use force_reprocess=True so we can re-process test data and extract new stories
+    logger.info("%sRunning Story Extraction Agent...", LOG_PREFIX)
+    story_extraction = await safe_run("story_extraction", StoryExtractionAgent(db, user_id).arun(
+        notion_pages=notion_pages,
+        events=events,
+        force_reprocess=True,  # Always re-process to extract new stories from meeting notes
+        notion_access_token=notion_access_token
+    ))
+    outputs["story_extraction"] = story_extraction
+    if story_extraction.get("success"):
+        logger.info("%sStory Extraction: %s stories extracted", LOG_PREFIX, story_extraction.get("stories_extracted", 0))
+        if story_extraction.get("notion_page_url"):
+            logger.info("%sNotion page created: %s", LOG_PREFIX, story_extraction.get("notion_page_url"))
+        elif story_extraction.get("notion_error"):
+            logger.warning("%sNotion page creation failed: %s", LOG_PREFIX, story_extraction.get("notion_error"))
+    yield "agent", {"agent": "story_extraction", "result": outputs["story_extraction"]}
+    
+    # Stories from this run: input to sprint planning and the report, and the
+    # source of the summary's approval counts
+    stories = []
+    story_ids = []
+    if outputs["story_extraction"].get("success"):
+        story_ids = outputs["story_extraction"].get("story_ids", [])
+    if story_ids:
+        try:
+            stories = await asyncio.to_thread(fetch_stories, db, user_id, story_ids)
+        except SQLAlchemyError as e:
+            logger.error("Error loading stories from this run: %s", e)
+    else:
+        logger.info("%sNo stories extracted in this run", LOG_PREFIX)
+    
+    # Plain copies for the report page, which may be filled in after this session closes
+    story_snapshots = [story_report_fields(s) for s in stories]
+    
+    # Auto-approved stories go straight into the Backlog database
+    auto_approved_stories = [s for s in story_snapshots if s["auto_approved"]]
+    stories_for_sprint = _format_stories_for_sprint(stories)
+    
+    # Determine meeting name and date from most recent meeting note
+    meeting_name = "Meeting"
+    meeting_date = datetime.now().isoformat()
+    parent_page_id = None
+    
+    # Use the most recent page as the meeting note. The pages were
+    # already fetched above, so an empty list means there's none to find.
+    if notion_pages:
+        most_recent_page = notion_pages[0]
+        meeting_name = most_recent_page.get("title", "Meeting")
+        meeting_date = most_recent_page.get("last_edited_time") or most_recent_page.get("created_time", meeting_date)
+        parent_page_id = most_recent_page.get("id")
+    
+    # 7a. Create the report page and Backlog entries while the agents run;
+    # the page content is filled in once their outputs are in
+    report_task = None
+    if parent_page_id and stories:
+        logger.info("%sCreating Notion report page and database entries...", LOG_PREFIX)
+        report_task = asyncio.create_task(asyncio.to_thread(
+            _start_report_page,
+            notion_access_token,
+            parent_page_id,
+            meeting_name,
+            meeting_date,
+            auto_approved_stories
+        ))
+    else:
+        logger.warning("Cannot create report page: missing parent page ID or stories")
+    
+    # 1-6. Every other agent only depends on story extraction, so run them
+    # concurrently. Each gets its own DB session - sessions aren't safe to
+    # share across concurrently running agents.
+    try:
+        page_contents = await prefetch_page_contents
+    except AGENT_ERRORS as e:
+        # Agents fall back to fetching page content themselves
+        logger.warning("%sCould not prefetch page content: %s", LOG_PREFIX, e)
+        page_contents = {}
+    
+    # Views shared (by reference) with every agent that reads Notion pages
+    page_context = {
+        "notion_pages": notion_pages,
+        "events": events,
+        "page_contents": page_contents,
+        "notion_access_token": notion_access_token
+    }
+    agent_jobs = [
+        ("customer_research", CustomerResearchAgent, page_context),
+        ("backlog_grooming", NoiseClearingAgent, {"run_started_at": run_started_at}),
+        ("cross_team_updates", CrossTeamAgent, page_context),
+        ("meeting_insights", MeetingInsightsAgent, page_context),
+        ("reporting", ReleaseReportAgent, {}),
+        ("sprint_planning", SprintPlanningAgent, {"stories": stories_for_sprint}),
+    ]
+    
+    # With no new stories, reporting and sprint planning would only restate
+    # the previous run, so reuse those outputs instead of rerunning them
+    reused_outputs = _reusable_story_outputs(user_id, outputs)
+    if reused_outputs:
+        logger.info("%sNo new stories - reusing previous %s outputs", LOG_PREFIX, ", ".join(reused_outputs))
+        agent_jobs = [job for job in agent_jobs if job[0] not in reused_outputs]
+        for output_key, result in reused_outputs.items():
+            outputs[output_key] = result
+            yield "agent", {"agent": output_key, "result": result}
+    
+    logger.info("%sRunning %d agents in parallel...", LOG_PREFIX, len(agent_jobs))
+    for next_done in asyncio.as_completed([
+        _run_agent_job(output_key, agent_class, user_id, kwargs)
+        for output_key, agent_class, kwargs in agent_jobs
+    ]):
+        output_key, result = await next_done
+        outputs[output_key] = result
+        yield "agent", {"agent": output_key, "result": result}
+    
+    _remember_story_outputs(user_id, outputs)
+    
+    customer_research = outputs["customer_research"]
+    if customer_research.get("success"):
+        logger.info("%sCustomer Research: %d themes found", LOG_PREFIX, len(customer_research.get("customer_themes", [])))
+    else:
+        logger.warning("%sCustomer Research: %s", LOG_PREFIX, customer_research.get("error", "Unknown error"))
+    
+    cross_team = outputs["cross_team_updates"]
+    if cross_team.get("success"):
+        logger.info("%sCross-Team: %d teams, %d dependencies", LOG_PREFIX, len(cross_team.get("team_highlights", [])), len(cross_team.get("dependencies", [])))
+    else:
+        logger.warning("%sCross-Team: %s", LOG_PREFIX, cross_team.get("error", "Unknown error"))
+    
+    meeting_insights = outputs["meeting_insights"]
+    if meeting_insights.get("success"):
+        logger.info("%sMeeting Insights: %s meetings, %s action items", LOG_PREFIX, meeting_insights.get("total_meetings", 0), meeting_insights.get("total_action_items", 0))
+    else:
+        logger.warning("%sMeeting Insights: %s", LOG_PREFIX, meeting_insights.get("error", "Unknown error"))
+    
+    sprint_planning = outputs["sprint_planning"]
+    if sprint_planning.get("success"):
+        logger.info("%sSprint Planning: %d items, %s points", LOG_PREFIX, len(sprint_planning.get("sprint_scope", [])), sprint_planning.get("total_points", 0))
+    else:
+        logger.warning("%sSprint Planning: %s", LOG_PREFIX, sprint_planning.get("error", "Unknown error"))
+    
+    # 7b. The Backlog entries are part of the response, so wait for them and
+    # the report page shell here
+    report_page = None
+    report_page_data = None
+    database_entries_result = None
+    report_status = "skipped"
+    if report_task:
+        try:
+            report_page, database_entries_result = await report_task
+        except AGENT_ERRORS:
+            logger.exception("Error creating Notion report page/database entries")
+        if database_entries_result and database_entries_result.get("notion_page_ids"):
+            await asyncio.to_thread(_save_notion_page_ids, db, stories, database_entries_result["notion_page_ids"])
+        if not report_page:
+            report_status = "failed"
+    
+    # 7c. Fill in the report page from all agents' outputs - after the
+    # response when the caller allows it, since nothing in the response needs it
+    if report_page:
+        finish_report_args = (
+            user_id, notion_access_token, parent_page_id, meeting_name, meeting_date,
+            outputs, story_snapshots, report_page, database_entries_result
+        )
+        _remember_for_user(_last_reports, user_id, {"status": "pending", "database_entries": database_entries_result})
+        if background_tasks is not None:
+            background_tasks.add_task(_finish_report, *finish_report_args)
+            report_status = "pending"
+        else:
+            report_page_data = await _finish_report(*finish_report_args)
+            report_status = "created" if report_page_data else "failed"
+    else:
+        _remember_for_user(_last_reports, user_id, {"status": report_status, "report_page": None, "database_entries": database_entries_result})
+    
+    # Calculate summary statistics
+    processing_time = time.perf_counter() - start_time
+    
+    # Extract summary data - each agent's metrics come from SUMMARY_EXTRACTORS
+    counts = _summarize_agent_outputs(outputs)
+    database_entries_created = 0
+    report_page_url = None
+    report_page_title = None
+    
+    # From report/database creation
+    if report_page_data:
+        report_page_url = report_page_data.get("url", "")
+        report_page_title = report_page_data.get("title", "")
+    
+    if database_entries_result and database_entries_result.get("success"):
+        database_entries_created = database_entries_result.get("created_count", 0)
+    
+    # Approval counts come from the stories loaded above, not the agent's counters
+    stories_pending_review = sum(1 for s in stories if s.status == "pending")
+    summary = {
+        "stories_extracted": counts["stories_extracted"],
+        "stories_auto_approved": len(auto_approved_stories),
+        "stories_pending_review": stories_pending_review,
+        "database_entries_created": database_entries_created,
+        "duplicates_found": counts["duplicates_found"],
+        "insights_generated": counts["insights_generated"],
+        "action_items_total": counts["action_items_total"],
+        "report_page_url": report_page_url,
+        "report_page_title": report_page_title
+    }
+    
+    logger.info("%sComplete! Processing time: %.2fs", LOG_PREFIX, processing_time)
+    
+    # Log summary
+    if database_entries_created > 0:
+        logger.info("%d stories auto-created in Backlog Database", database_entries_created)
+    if report_page_url:
+        logger.info("Full report page: %s (%s)", report_page_title or "Meeting Ended Report", report_page_url)
+    if stories_pending_review > 0:
+        logger.warning("%d stories need review (see report page)", stories_pending_review)
+    
+    yield "complete", {
+        "success": True,
+        "processing_time_seconds": round(processing_time, 2),
+        "outputs": outputs,
+        "summary": summary,
+        "report_page": report_page_data,
+        "report_status": report_status,
+        "database_entries": database_entries_result
+    }
 
 
 @router.post("/trigger-meeting-ended")
 async def trigger_meeting_ended(
+    background_tasks: BackgroundTasks,
     user_id: str = "default",
     db: Session = Depends(get_db)
 ) -> Dict[str, Any]:
@@ -98,424 +724,91 @@ async def trigger_meeting_ended(
     This endpoint:
     1. Clears automation states to avoid duplicates
     2. Fetches all recent data (Notion pages, meeting notes, backlog items)
-    3. Runs all 6 agents sequentially
+    3. Runs story extraction, then the other 6 agents in parallel
     4. Collects outputs and creates checklist items
     5. Returns comprehensive summary to frontend
     
+    The Notion report page is finished after the response is sent, so the
+    response has report_status "pending"; poll /last-report for the page.
+    Use /trigger-meeting-ended/stream to receive each agent's output as it
+    finishes (that stream waits for the report instead).
+    
     Note: In production, user_id should come from authentication token.
     For now, using "default" as the user_id.
     
     Returns:
         Dict with outputs from all 6 agents and summary statistics
     """
-    start_time = time.time()
+    start_time = time.perf_counter()
     
     try:
-        # Clear automation states before starting
-        clear_automation_states(db, user_id)
-        
-        # Get tokens
-        notion_token = get_token(db, "notion")
-        google_token = get_token(db, "google")
-        
-        if not notion_token:
-            raise HTTPException(
-                status_code=400,
-                detail="Notion not connected. Please connect your Notion account first."
-            )
-        
-        # Fetch recent data
-        print("[Meeting Ended Pipeline] Fetching data...")
-        notion_pages = get_notion_pages(notion_token.access_token, page_size=100, include_archived=False)
-        
-        events = None
-        if google_token:
-            try:
-                events, _ = get_upcoming_events(
-                    google_token.access_token,
-                    google_token.refresh_token,
-                    max_results=50
-                )
-            except Exception as e:
-                print(f"Warning: Could not fetch Google Calendar events: {str(e)}")
-                events = None
-        
-        print(f"[Meeting Ended Pipeline] Fetched {len(notion_pages)} pages and {len(events) if events else 0} events")
-        
-        # Initialize all agents
-        story_extraction_agent = StoryExtractionAgent(db, user_id)
-        customer_research_agent = CustomerResearchAgent(db, user_id)
-        backlog_grooming_agent = NoiseClearingAgent(db, user_id)
-        cross_team_agent = CrossTeamAgent(db, user_id)
-        meeting_insights_agent = MeetingInsightsAgent(db, user_id)
-        reporting_agent = ReleaseReportAgent(db, user_id)
-        sprint_planning_agent = SprintPlanningAgent(db, user_id)
-        
-        # Run all agents (sequentially for now to avoid DB conflicts)
-        # TODO: Consider running in parallel with proper DB session handling
-        print("[Meeting Ended Pipeline] Running agents...")
-        
-        outputs = {}
-        
-        # 0. Story Extraction (must run first to extract stories from meeting notes)
-        # Use force_reprocess=True so we can re-process test data and extract new stories
-        print("[Meeting Ended Pipeline] Running Story Extraction Agent...")
-        try:
-            story_extraction = story_extraction_agent.run(
-                notion_pages=notion_pages,
-                events=events,
-                force_reprocess=True  # Always re-process to extract new stories from meeting notes
-            )
-            outputs["story_extraction"] = story_extraction
-            print(f"[Meeting Ended Pipeline] Story Extraction: {story_extraction.get('stories_extracted', 0)} stories extracted")
-            if story_extraction.get("notion_page_url"):
-                print(f"[Meeting Ended Pipeline] ✅ Notion page created: {story_extraction.get('notion_page_url')}")
-            elif story_extraction.get("notion_error"):
-                print(f"[Meeting Ended Pipeline] ❌ Notion page creation failed: {story_extraction.get('notion_error')}")
-        except Exception as e:
-            print(f"Error in story extraction agent: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            outputs["story_extraction"] = {"success": False, "error": str(e)}
-        
-        # 1. Customer & Market Research
-        print("[Meeting Ended Pipeline] Running Customer Research Agent...")
-        try:
-            customer_research = customer_research_agent.run(notion_pages=notion_pages, events=events)
-            outputs["customer_research"] = customer_research
-            if customer_research.get("success"):
-                print(f"[Meeting Ended Pipeline] Customer Research: {len(customer_research.get('customer_themes', []))} themes found")
-            else:
-                print(f"[Meeting Ended Pipeline] Customer Research: {customer_research.get('error', 'Unknown error')}")
-        except Exception as e:
-            print(f"Error in customer research agent: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            outputs["customer_research"] = {"success": False, "error": str(e)}
-        
-        # 2. Backlog Grooming
-        print("[Meeting Ended Pipeline] Running Backlog Grooming Agent...")
-        try:
-            backlog_grooming = backlog_grooming_agent.run()
-            outputs["backlog_grooming"] = backlog_grooming
-        except Exception as e:
-            print(f"Error in backlog grooming agent: {str(e)}")
-            outputs["backlog_grooming"] = {"success": False, "error": str(e)}
-        
-        # 3. Cross-Team Updates
-        print("[Meeting Ended Pipeline] Running Cross-Team Agent...")
-        try:
-            cross_team = cross_team_agent.run(notion_pages=notion_pages, events=events)
-            outputs["cross_team_updates"] = cross_team
-            if cross_team.get("success"):
-                print(f"[Meeting Ended Pipeline] Cross-Team: {len(cross_team.get('team_highlights', []))} teams, {len(cross_team.get('dependencies', []))} dependencies")
-            else:
-                print(f"[Meeting Ended Pipeline] Cross-Team: {cross_team.get('error', 'Unknown error')}")
-        except Exception as e:
-            print(f"Error in cross-team agent: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            outputs["cross_team_updates"] = {"success": False, "error": str(e)}
-        
-        # 4. Meeting Insights
-        print("[Meeting Ended Pipeline] Running Meeting Insights Agent...")
-        try:
-            meeting_insights = meeting_insights_agent.run(notion_pages=notion_pages, events=events)
-            outputs["meeting_insights"] = meeting_insights
-            if meeting_insights.get("success"):
-                print(f"[Meeting Ended Pipeline] Meeting Insights: {meeting_insights.get('total_meetings', 0)} meetings, {meeting_insights.get('total_action_items', 0)} action items")
-            else:
-                print(f"[Meeting Ended Pipeline] Meeting Insights: {meeting_insights.get('error', 'Unknown error')}")
-        except Exception as e:
-            print(f"Error in meeting insights agent: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            outputs["meeting_insights"] = {"success": False, "error": str(e)}
-        
-        # 5. Reporting & Release Notes
-        print("[Meeting Ended Pipeline] Running Reporting Agent...")
-        try:
-            reporting = reporting_agent.run()
-            outputs["reporting"] = reporting
-        except Exception as e:
-            print(f"Error in reporting agent: {str(e)}")
-            outputs["reporting"] = {"success": False, "error": str(e)}
-        
-        # 6. Sprint Planning
-        print("[Meeting Ended Pipeline] Running Sprint Planning Agent...")
-        try:
-            # Get stories from story extraction output or database
-            # Only use stories from the CURRENT run (from story extraction output)
-            stories_for_sprint = None
-            if outputs.get("story_extraction", {}).get("success"):
-                story_data = outputs["story_extraction"]
-                # Get Story objects from database - ONLY from current run
-                from database import Story
-                story_ids = story_data.get("story_ids", [])
-                if story_ids:
-                    # Only query stories from the current run (by ID list from story extraction)
-                    stories_from_db = db.query(Story).filter(
-                        Story.id.in_(story_ids),
-                        Story.user_id == user_id,
-                        Story.status.in_(["pending", "approved"])  # Only active stories
-                    ).all()
-                    # Convert to dict format
-                    priority_order = {"high": 1, "medium": 2, "low": 3}
-                    stories_sorted = sorted(
-                        stories_from_db,
-                        key=lambda s: (
-                            priority_order.get(s.priority, 2),
-                            -(s.story_points if s.story_points else 0)
-                        )
-                    )
-                    stories_for_sprint = [
-                        {
-                            "id": s.id,
-                            "title": s.title,
-                            "description": s.description,
-                            "priority": s.priority,
-                            "points": s.story_points or (8 if s.priority == "high" else (5 if s.priority == "medium" else 3)),
-                            "story_points": s.story_points,
-                            "owner": s.owner,
-                            "tags": json.loads(s.tags) if s.tags else []
-                        }
-                        for s in stories_sorted
-                    ]
-                else:
-                    # Fallback: get stories from current run only (last 5 minutes)
-                    from datetime import timedelta
-                    recent_cutoff = datetime.utcnow() - timedelta(minutes=5)
-                    stories_from_db = db.query(Story).filter(
-                        Story.user_id == user_id,
-                        Story.status.in_(["pending", "approved"]),
-                        Story.created_at >= recent_cutoff  # Only current run
-                    ).all()
-                    if stories_from_db:
-                        priority_order = {"high": 1, "medium": 2, "low": 3}
-                        stories_sorted = sorted(
-                            stories_from_db,
-                            key=lambda s: (
-                                priority_order.get(s.priority, 2),
-                                -(s.story_points if s.story_points else 0)
-                            )
-                        )
-                        stories_for_sprint = [
-                            {
-                                "id": s.id,
-                                "title": s.title,
-                                "description": s.description,
-                                "priority": s.priority,
-                                "points": s.story_points or (8 if s.priority == "high" else (5 if s.priority == "medium" else 3)),
-                                "story_points": s.story_points,
-                                "owner": s.owner,
-                                "tags": json.loads(s.tags) if s.tags else []
-                            }
-                            for s in stories_sorted
-                        ]
-            
-            sprint_planning = sprint_planning_agent.run(stories=stories_for_sprint)
-            outputs["sprint_planning"] = sprint_planning
-            if sprint_planning.get("success"):
-                print(f"[Meeting Ended Pipeline] Sprint Planning: {len(sprint_planning.get('sprint_scope', []))} items, {sprint_planning.get('total_points', 0)} points")
-            else:
-                print(f"[Meeting Ended Pipeline] Sprint Planning: {sprint_planning.get('error', 'Unknown error')}")
-        except Exception as e:
-            print(f"Error in sprint planning agent: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            outputs["sprint_planning"] = {"success": False, "error": str(e)}
-        
-        # 7. Create Comprehensive Report Page and Backlog Database Entries
-        print("[Meeting Ended Pipeline] Creating Notion report and database entries...")
-        report_page_data = None
-        database_entries_result = None
-        
-        try:
-            from utils.notion_reports import create_comprehensive_report_page, create_backlog_database_entries
-            
-            # Get stories from story extraction - ONLY from current run
-            stories = []
-            if outputs.get("story_extraction", {}).get("success"):
-                story_data = outputs["story_extraction"]
-                # Get Story objects from database - ONLY from current run
-                from database import Story
-                story_ids = story_data.get("story_ids", [])
-                if story_ids:
-                    # Only get stories from current run (by ID list)
-                    stories = db.query(Story).filter(
-                        Story.id.in_(story_ids),
-                        Story.user_id == user_id,
-                        Story.status.in_(["pending", "approved"])  # Only active stories from current run
-                    ).all()
-                else:
-                    # Fallback: get stories from current run only (last 5 minutes)
-                    from datetime import timedelta
-                    recent_cutoff = datetime.utcnow() - timedelta(minutes=5)
-                    stories = db.query(Story).filter(
-                        Story.user_id == user_id,
-                        Story.status.in_(["pending", "approved"]),
-                        Story.created_at >= recent_cutoff  # Only current run
-                    ).order_by(Story.created_at.desc()).limit(100).all()
-            
-            # Determine meeting name and date from most recent meeting note
-            meeting_name = "Meeting"
-            meeting_date = datetime.now().isoformat()
-            parent_page_id = None
-            
-            if notion_pages and len(notion_pages) > 0:
-                # Use the most recent page as the meeting note
-                most_recent_page = notion_pages[0]
-                meeting_name = most_recent_page.get("title", "Meeting")
-                meeting_date = most_recent_page.get("last_edited_time") or most_recent_page.get("created_time", meeting_date)
-                parent_page_id = most_recent_page.get("id")
-            
-            # If no parent page, try to find one
-            if not parent_page_id:
-                try:
-                    pages = get_notion_pages(notion_token.access_token, page_size=1, include_archived=False)
-                    if pages and len(pages) > 0:
-                        parent_page_id = pages[0].get("id")
-                        meeting_name = pages[0].get("title", "Meeting")
-                except Exception as e:
-                    print(f"⚠️ Error finding parent page: {str(e)}")
-            
-            # Create comprehensive report page
-            if parent_page_id and stories:
-                report_page_data = create_comprehensive_report_page(
-                    access_token=notion_token.access_token,
-                    parent_page_id=parent_page_id,
-                    meeting_name=meeting_name,
-                    meeting_date=meeting_date,
-                    agent_outputs=outputs,
-                    stories=stories
-                )
-                
-                if report_page_data:
-                    report_page_url = report_page_data.get("url", "")
-                    print(f"✅ Created comprehensive report page: {report_page_url}")
-                    
-                    # Create backlog database entries for auto-approved stories
-                    auto_approved_stories = [s for s in stories if s.status == "approved" and (s.confidence or 0) >= 80]
-                    if auto_approved_stories:
-                        database_entries_result = create_backlog_database_entries(
-                            access_token=notion_token.access_token,
-                            stories=auto_approved_stories,
-                            report_page_url=report_page_url
-                        )
-                        
-                        if database_entries_result.get("success"):
-                            print(f"✅ Created {database_entries_result.get('created_count', 0)} stories in Backlog database")
-                        else:
-                            print(f"⚠️ Database entries creation had issues: {database_entries_result.get('error', 'Unknown error')}")
-                else:
-                    print("⚠️ Failed to create report page")
-            else:
-                print("⚠️ Cannot create report page: missing parent page ID or stories")
-        
-        except Exception as e:
-            print(f"⚠️ Error creating Notion report/database entries: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            # Continue even if report creation fails
-        
-        # Calculate summary statistics
-        processing_time = time.time() - start_time
-        
-        # Extract summary data
-        stories_extracted = 0
-        stories_auto_approved = 0
-        stories_pending_review = 0
-        database_entries_created = 0
-        duplicates_found = 0
-        insights_generated = 0
-        action_items_total = 0
-        report_page_url = None
-        report_page_title = None
-        
-        # From story extraction
-        if outputs.get("story_extraction", {}).get("success"):
-            story_data = outputs["story_extraction"]
-            stories_extracted = story_data.get("stories_extracted", 0) or len(story_data.get("stories", []))
-            auto_approved_stories = story_data.get("auto_approved_stories", [])
-            pending_review_stories = story_data.get("pending_review_stories", [])
-            if isinstance(auto_approved_stories, list):
-                stories_auto_approved = len(auto_approved_stories)
-            else:
-                stories_auto_approved = story_data.get("auto_approved_count", 0)
-            if isinstance(pending_review_stories, list):
-                stories_pending_review = len(pending_review_stories)
-            else:
-                stories_pending_review = story_data.get("pending_review_count", 0)
-        
-        # From backlog grooming
-        if outputs.get("backlog_grooming", {}).get("success"):
-            backlog_data = outputs["backlog_grooming"]
-            duplicates_found = backlog_data.get("duplicate_count", len(backlog_data.get("duplicates", [])))
-        
-        # From meeting insights
-        if outputs.get("meeting_insights", {}).get("success"):
-            meeting_data = outputs["meeting_insights"]
-            meetings = meeting_data.get("meetings", [])
-            insights_generated = meeting_data.get("total_meetings", len(meetings))
-            action_items_total = meeting_data.get("total_action_items", 0) or sum(len(m.get("action_items", [])) for m in meetings)
-        
-        # From customer research
-        if outputs.get("customer_research", {}).get("success"):
-            customer_data = outputs["customer_research"]
-            themes = customer_data.get("customer_themes", [])
-            insights_generated += len(themes)
-        
-        # From cross-team updates
-        if outputs.get("cross_team_updates", {}).get("success"):
-            cross_team_data = outputs["cross_team_updates"]
-            recommended_actions = cross_team_data.get("recommended_actions", [])
-            action_items_total += len(recommended_actions)
-        
-        # From report/database creation
-        if report_page_data:
-            report_page_url = report_page_data.get("url", "")
-            report_page_title = report_page_data.get("title", "")
-        
-        if database_entries_result and database_entries_result.get("success"):
-            database_entries_created = database_entries_result.get("created_count", 0)
-        
-        summary = {
-            "stories_extracted": stories_extracted,
-            "stories_auto_approved": stories_auto_approved,
-            "stories_pending_review": stories_pending_review,
-            "database_entries_created": database_entries_created,
-            "duplicates_found": duplicates_found,
-            "insights_generated": insights_generated,
-            "action_items_total": action_items_total,
-            "report_page_url": report_page_url,
-            "report_page_title": report_page_title
-        }
-        
-        print(f"[Meeting Ended Pipeline] Complete! Processing time: {processing_time:.2f}s")
-        
-        # Log summary
-        if database_entries_created > 0:
-            print(f"✅ {database_entries_created} stories auto-created in Backlog Database")
-        if report_page_url:
-            print(f"📄 Full report page: {report_page_title or 'Meeting Ended Report'}")
-            print(f"   URL: {report_page_url}")
-        if stories_pending_review > 0:
-            print(f"⚠️ {stories_pending_review} stories need review (see report page)")
-        
-        return {
-            "success": True,
-            "processing_time_seconds": round(processing_time, 2),
-            "outputs": outputs,
-            "summary": summary,
-            "report_page": report_page_data,
-            "database_entries": database_entries_result
-        }
-        
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
+        notion_token, google_token = await asyncio.to_thread(_start_pipeline_run, db, user_id)
+        
+        response = None
+        async for event, data in _run_pipeline(db, user_id, notion_token, google_token, start_time, background_tasks):
+            if event == "complete":
+                response = data
+        return response
+        
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Error running meeting ended pipeline")
         raise HTTPException(
             status_code=500,
-            detail=f"Error running meeting ended pipeline: {str(e)}"
+            detail="Error running meeting ended pipeline"
         )
 
+
+@router.get("/last-report")
+async def get_last_report(user_id: str = "default") -> Dict[str, Any]:
+    """Get the report page from the user's latest meeting ended run.
+    
+    Returns:
+        Dict with status ("pending", "created", "failed", "skipped" or "none"),
+        plus report_page and database_entries once the report is done
+    """
+    return _recall_for_user(_last_reports, user_id) or {"status": "none"}
+
+
+def _sse_event(event: str, data: Dict[str, Any]) -> bytes:
+    """Format one Server-Sent Event."""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data, default=str) + b"\n\n"
+
+
+@router.post("/trigger-meeting-ended/stream")
+async def trigger_meeting_ended_stream(user_id: str = "default"):
+    """Run the meeting ended pipeline, streaming progress as Server-Sent Events.
+    
+    Emits an "agent" event ({"agent": name, "result": output}) as each agent
+    finishes, then a "complete" event with the same payload /trigger-meeting-ended
+    returns. A failure mid-run is reported as an "error" event.
+    
+    The pipeline gets its own DB session rather than a get_db dependency, since
+    dependency cleanup runs before a streamed body is sent.
+    """
+    start_time = time.perf_counter()
+    
+    db = SessionLocal()
+    try:
+        # Check tokens up front so a missing connection is still a plain 400
+        notion_token, google_token = await asyncio.to_thread(_start_pipeline_run, db, user_id)
+    except Exception:
+        db.close()
+        raise
+    
+    async def event_stream():
+        try:
+            async for event, data in _run_pipeline(db, user_id, notion_token, google_token, start_time):
+                yield _sse_event(event, data)
+        except Exception:
+            logger.exception("Error running meeting ended pipeline")
+            yield _sse_event("error", {"detail": "Error running meeting ended pipeline"})
+        finally:
+            db.close()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,17 +1,36 @@
 """Break management routes for editing and customizing breaks."""
-from fastapi import APIRouter, HTTPException, Depends, Body
+from fastapi import APIRouter, HTTPException, Body, Depends, Request, Response
 from sqlalchemy.orm import Session
-from database import get_db
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict
-from datetime import datetime
+import hashlib
 import json
+import logging
+import uuid
+import orjson
+from database import get_db, BreakCustomization
+from utils.break_types import get_all_break_types
 
 router = APIRouter()
 
-# In-memory store for user break customizations (in production, use database)
-# This is a module-level variable that can be accessed by other modules
-_break_customizations: Dict[str, List[Dict]] = {}
+logger = logging.getLogger(__name__)
+
+
+def get_user_break_customizations(db: Session, user_id: str) -> List[Dict]:
+    """Get a user's customized breaks, or an empty list if they have none."""
+    customization = db.get(BreakCustomization, user_id)
+    return customization.breaks if customization and customization.breaks else []
+
+
+def _save_break_customizations(db: Session, user_id: str, breaks: List[Dict]):
+    """Replace a user's customized breaks and commit."""
+    db.merge(BreakCustomization(user_id=user_id, breaks=breaks))
+    db.commit()
+
+
+def _new_break_id() -> str:
+    """Generate a unique ID for a custom break (timestamps collide within a request)."""
+    return f"break_{uuid.uuid4().hex}"
 
 
 class BreakUpdate(BaseModel):
@@ -26,6 +45,12 @@ class BreakUpdate(BaseModel):
     custom: bool = False
 
 
+class BreakCustomizeRequest(BaseModel):
+    """Model for saving a user's break customizations."""
+    breaks: List[BreakUpdate] = []
+    user_id: str = "default"  # In production, get from auth
+
+
 class BreakCreate(BaseModel):
     """Model for creating a new break."""
     time: str
@@ -42,34 +67,33 @@ class BreakDelete(BaseModel):
     time: str
 
 
+# Break types are static, so encode them and compute their ETag once at import
+_BREAK_TYPES_BYTES = orjson.dumps({"break_types": get_all_break_types()})
+_BREAK_TYPES_ETAG = f'"{hashlib.md5(_BREAK_TYPES_BYTES).hexdigest()}"'
+
+
 @router.get("/types")
-async def get_break_types():
+async def get_break_types(request: Request):
     """Get all available break types."""
-    from utils.break_types import get_all_break_types
-    return {"break_types": get_all_break_types()}
+    headers = {"ETag": _BREAK_TYPES_ETAG, "Cache-Control": "public, max-age=3600"}
+    if request.headers.get("if-none-match") == _BREAK_TYPES_ETAG:
+        return Response(status_code=304, headers=headers)
+    return Response(content=_BREAK_TYPES_BYTES, media_type="application/json", headers=headers)
 
 
 @router.post("/customize")
 async def customize_breaks(
-    request_data: dict = Body(...),
+    request_data: BreakCustomizeRequest,
     db: Session = Depends(get_db)
 ):
     """Save user's break customizations. Accepts breaks list and optional user_id in request body."""
     try:
-        breaks_data = request_data.get("breaks", [])
-        user_id = request_data.get("user_id", "default")  # In production, get from auth
+        user_id = request_data.user_id
         
-        # Validate breaks
-        validated_breaks = []
-        for break_dict in breaks_data:
-            # Handle both dict and BreakUpdate objects
-            if isinstance(break_dict, dict):
-                break_item = BreakUpdate(**break_dict)
-            else:
-                break_item = break_dict
-            
-            validated_breaks.append({
-                "id": break_item.id or f"break_{datetime.utcnow().timestamp()}",
+        # The breaks were validated as BreakUpdate when the body was parsed
+        validated_breaks = [
+            {
+                "id": break_item.id or _new_break_id(),
                 "time": break_item.time,
                 "duration": break_item.duration,
                 "activity": break_item.activity,
@@ -77,20 +101,21 @@ async def customize_breaks(
                 "description": break_item.description,
                 "icon": break_item.icon,
                 "custom": break_item.custom,
-            })
+            }
+            for break_item in request_data.breaks
+        ]
         
-        # Store customizations (in production, save to database)
-        _break_customizations[user_id] = validated_breaks
+        # Store customizations
+        _save_break_customizations(db, user_id, validated_breaks)
         
         return {
             "success": True,
             "message": "Breaks customized successfully",
             "breaks": validated_breaks
         }
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Error customizing breaks: {str(e)}")
+    except Exception:
+        logger.exception("Error customizing breaks")
+        raise HTTPException(status_code=500, detail="Error customizing breaks")
 
 
 @router.get("/customizations")
@@ -99,7 +124,7 @@ async def get_break_customizations(
     db: Session = Depends(get_db)
 ):
     """Get user's break customizations."""
-    customizations = _break_customizations.get(user_id, [])
+    customizations = get_user_break_customizations(db, user_id)
     return {"breaks": customizations}
 
 
@@ -112,7 +137,7 @@ async def add_break(
     """Add a new custom break."""
     try:
         new_break = {
-            "id": f"break_{datetime.utcnow().timestamp()}",
+            "id": _new_break_id(),
             "time": break_item.time,
             "duration": break_item.duration,
             "activity": break_item.activity,
@@ -123,9 +148,7 @@ async def add_break(
         }
         
         # Add to customizations
-        if user_id not in _break_customizations:
-            _break_customizations[user_id] = []
-        _break_customizations[user_id].append(new_break)
+        _save_break_customizations(db, user_id, get_user_break_customizations(db, user_id) + [new_break])
         
         return {
             "success": True,
@@ -144,11 +167,12 @@ async def delete_break(
 ):
     """Delete a break."""
     try:
-        if user_id in _break_customizations:
-            _break_customizations[user_id] = [
-                b for b in _break_customizations[user_id]
+        custom_breaks = get_user_break_customizations(db, user_id)
+        if custom_breaks:
+            _save_break_customizations(db, user_id, [
+                b for b in custom_breaks
                 if b.get("id") != break_id
-            ]
+            ])
         
         return {
             "success": True,
@@ -160,8 +184,7 @@ async def delete_break(
 
 @router.post("/clear-cache")
 async def clear_break_cache(
-    user_id: str = Body(default="default"),
-    db: Session = Depends(get_db)
+    user_id: str = Body(default="default")
 ):
     """Clear break cache to force regeneration of breaks."""
     try:
@@ -1,15 +1,19 @@
 """API routes for checklist and automation."""
+import logging
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select, update, func, case, or_
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-import json
-from database import get_db, ChecklistItem, Story, ReleaseReport, Stakeholder, BacklogHealth
+from database import get_db, get_read_db, ChecklistItem, Story, ReleaseReport, Stakeholder, BacklogHealth
 from utils.agents import StoryExtractionAgent, NoiseClearingAgent, ReleaseReportAgent, StakeholderAgent
 
 router = APIRouter()
 
+logger = logging.getLogger(__name__)
+
 
 class ChecklistItemResponse(BaseModel):
     """Checklist item response model."""
@@ -40,11 +44,67 @@ class ChecklistActionRequest(BaseModel):
     action_data: Optional[Dict[str, Any]] = None
 
 
+# Story status set by each non-approve story action, and the checklist item
+# types it resolves; the status is also the action's count key in the response
+STORY_STATUS_ACTIONS = {
+    "reject": ("rejected", ["story_approval"]),
+    "archive": ("archived", ["story_approval", "backlog_cleanup"]),
+}
+
+
+def _resolve_related_checklist_items(db: Session, user_id: str, types: List[str], story_ids: List[str]) -> int:
+    """Mark pending checklist items that reference any of the stories as resolved.
+    
+    Only id and action_data are loaded to find the matches; they are then
+    resolved with a single UPDATE. The caller commits.
+    
+    Returns:
+        Number of checklist items resolved
+    """
+    story_ids_set = set(story_ids)
+    rows = db.execute(
+        select(ChecklistItem.id, ChecklistItem.action_data).where(
+            ChecklistItem.user_id == user_id,
+            ChecklistItem.type.in_(types),
+            ChecklistItem.status == "pending"
+        )
+    ).all()
+    ids_to_resolve = [
+        item_id for item_id, action_data in rows
+        if isinstance(action_data, dict) and story_ids_set.intersection(action_data.get("story_ids", []))
+    ]
+    if not ids_to_resolve:
+        return 0
+    
+    db.execute(
+        update(ChecklistItem)
+        .where(ChecklistItem.id.in_(ids_to_resolve))
+        .values(status="resolved", resolved_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    return len(ids_to_resolve)
+
+
+def _set_story_status(db: Session, user_id: str, story_ids: List[str], status: str) -> int:
+    """Set the status of the user's stories with a single UPDATE. The caller commits.
+    
+    Returns:
+        Number of stories updated
+    """
+    result = db.execute(
+        update(Story)
+        .where(Story.id.in_(story_ids), Story.user_id == user_id)
+        .values(status=status, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
 @router.get("", response_model=List[ChecklistItemResponse])
 async def get_checklist(
     user_id: str = "default",
     status: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get checklist items for the user.
     
@@ -56,47 +116,49 @@ async def get_checklist(
     Returns:
         List of checklist items
     """
-    query = db.query(ChecklistItem).filter(ChecklistItem.user_id == user_id)
+    # Select just the response columns: plain row tuples skip ORM instance
+    # construction and the identity map, which a read-only list doesn't need
+    query = select(
+        ChecklistItem.id,
+        ChecklistItem.type,
+        ChecklistItem.title,
+        ChecklistItem.description,
+        ChecklistItem.status,
+        ChecklistItem.priority,
+        ChecklistItem.action_type,
+        ChecklistItem.action_data,
+        ChecklistItem.meta_data,
+        ChecklistItem.created_at,
+        ChecklistItem.resolved_at
+    ).where(ChecklistItem.user_id == user_id)
     
     if status:
-        query = query.filter(ChecklistItem.status == status)
+        query = query.where(ChecklistItem.status == status)
     # If status is None, return all items (not just pending)
     
-    items = query.order_by(ChecklistItem.created_at.desc()).limit(100).all()
+    rows = db.execute(query.order_by(ChecklistItem.created_at.desc()).limit(100)).all()
+    
+    # JSON fields are decoded by the column type. Returning the response
+    # directly skips FastAPI's jsonable_encoder and response_model validation;
+    # the dicts have ChecklistItemResponse's shape, which still documents the endpoint.
+    checklist_items = [
+        {
+            "id": row.id,
+            "type": row.type,
+            "title": row.title,
+            "description": row.description,
+            "status": row.status,
+            "priority": row.priority,
+            "action_type": row.action_type,
+            "action_data": row.action_data,
+            "metadata": row.meta_data,
+            "created_at": row.created_at.isoformat() if row.created_at else "",
+            "resolved_at": row.resolved_at.isoformat() if row.resolved_at else None
+        }
+        for row in rows
+    ]
     
-    # Parse JSON fields
-    checklist_items = []
-    for item in items:
-        action_data = None
-        metadata = None
-        
-        if item.action_data:
-            try:
-                action_data = json.loads(item.action_data)
-            except:
-                pass
-        
-        if item.meta_data:
-            try:
-                metadata = json.loads(item.meta_data)
-            except:
-                pass
-        
-        checklist_items.append(ChecklistItemResponse(
-            id=item.id,
-            type=item.type,
-            title=item.title,
-            description=item.description,
-            status=item.status,
-            priority=item.priority,
-            action_type=item.action_type,
-            action_data=action_data,
-            metadata=metadata,
-            created_at=item.created_at.isoformat() if item.created_at else "",
-            resolved_at=item.resolved_at.isoformat() if item.resolved_at else None
-        ))
-    
-    return checklist_items
+    return ORJSONResponse(checklist_items)
 
 
 @router.post("/stories/action")
@@ -124,25 +186,7 @@ async def approve_stories(
         result = agent.approve_stories(request.story_ids, create_in_notion=True)
         
         # Resolve related checklist items
-        checklist_items = db.query(ChecklistItem).filter(
-            ChecklistItem.user_id == user_id,
-            ChecklistItem.type == "story_approval",
-            ChecklistItem.status == "pending"
-        ).all()
-        
-        resolved_count = 0
-        for item in checklist_items:
-            if item.action_data:
-                try:
-                    action_data = json.loads(item.action_data)
-                    item_story_ids = action_data.get("story_ids", [])
-                    # Check if any of the approved stories are in this checklist item
-                    if set(item_story_ids) & set(request.story_ids):
-                        item.status = "resolved"
-                        item.resolved_at = datetime.utcnow()
-                        resolved_count += 1
-                except:
-                    pass
+        resolved_count = _resolve_related_checklist_items(db, user_id, ["story_approval"], request.story_ids)
         
         try:
             db.commit()
@@ -159,94 +203,26 @@ async def approve_stories(
             "warning": result.get("warning")
         }
     
-    elif request.action == "reject":
-        # Mark stories as rejected
-        stories = db.query(Story).filter(
-            Story.id.in_(request.story_ids),
-            Story.user_id == user_id
-        ).all()
-        
-        for story in stories:
-            story.status = "rejected"
-            story.updated_at = datetime.utcnow()
-        
-        # Resolve related checklist items
-        checklist_items = db.query(ChecklistItem).filter(
-            ChecklistItem.user_id == user_id,
-            ChecklistItem.type == "story_approval",
-            ChecklistItem.status == "pending"
-        ).all()
-        
-        resolved_count = 0
-        for item in checklist_items:
-            if item.action_data:
-                try:
-                    action_data = json.loads(item.action_data)
-                    item_story_ids = action_data.get("story_ids", [])
-                    if set(item_story_ids) & set(request.story_ids):
-                        item.status = "resolved"
-                        item.resolved_at = datetime.utcnow()
-                        resolved_count += 1
-                except:
-                    pass
-        
-        try:
-            db.commit()
-        except Exception as e:
-            db.rollback()
-            raise HTTPException(status_code=500, detail=f"Error committing changes: {str(e)}")
-        
-        return {
-            "success": True,
-            "rejected": len(stories),
-            "checklist_items_resolved": resolved_count
-        }
+    if request.action not in STORY_STATUS_ACTIONS:
+        raise HTTPException(status_code=400, detail=f"Invalid action: {request.action}. Must be 'approve', 'reject', or 'archive'")
     
-    elif request.action == "archive":
-        # Mark stories as archived
-        stories = db.query(Story).filter(
-            Story.id.in_(request.story_ids),
-            Story.user_id == user_id
-        ).all()
-        
-        for story in stories:
-            story.status = "archived"
-            story.updated_at = datetime.utcnow()
-        
-        # Resolve related checklist items
-        checklist_items = db.query(ChecklistItem).filter(
-            ChecklistItem.user_id == user_id,
-            ChecklistItem.type.in_(["story_approval", "backlog_cleanup"]),
-            ChecklistItem.status == "pending"
-        ).all()
-        
-        resolved_count = 0
-        for item in checklist_items:
-            if item.action_data:
-                try:
-                    action_data = json.loads(item.action_data)
-                    item_story_ids = action_data.get("story_ids", [])
-                    if set(item_story_ids) & set(request.story_ids):
-                        item.status = "resolved"
-                        item.resolved_at = datetime.utcnow()
-                        resolved_count += 1
-                except:
-                    pass
-        
-        try:
-            db.commit()
-        except Exception as e:
-            db.rollback()
-            raise HTTPException(status_code=500, detail=f"Error committing changes: {str(e)}")
-        
-        return {
-            "success": True,
-            "archived": len(stories),
-            "checklist_items_resolved": resolved_count
-        }
+    # Reject/archive: set the stories' status and resolve related checklist
+    # items, committed together
+    status, checklist_types = STORY_STATUS_ACTIONS[request.action]
+    story_count = _set_story_status(db, user_id, request.story_ids, status)
+    resolved_count = _resolve_related_checklist_items(db, user_id, checklist_types, request.story_ids)
     
-    else:
-        raise HTTPException(status_code=400, detail=f"Invalid action: {request.action}. Must be 'approve', 'reject', or 'archive'")
+    try:
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error committing changes: {str(e)}")
+    
+    return {
+        "success": True,
+        status: story_count,
+        "checklist_items_resolved": resolved_count
+    }
 
 
 @router.post("/items/{item_id}/action")
@@ -282,15 +258,15 @@ async def handle_checklist_action(
         # If this is a story approval item and action_data contains story_ids, approve them
         if item.type == "story_approval" and item.action_data:
             try:
-                action_data = json.loads(item.action_data)
+                action_data = item.action_data
                 story_ids = action_data.get("story_ids", [])
                 if story_ids and request.action_data and request.action_data.get("auto_approve_stories"):
                     # Auto-approve stories when resolving
                     agent = StoryExtractionAgent(db, user_id)
                     agent.approve_stories(story_ids, create_in_notion=True)
-            except Exception as e:
+            except Exception:
                 # Log error but don't fail the resolve action
-                print(f"Error auto-approving stories: {str(e)}")
+                logger.exception("Error auto-approving stories")
         
         try:
             db.commit()
@@ -339,17 +315,14 @@ async def clear_all_checklist_items(
         Result with count of cleared items
     """
     try:
-        # Mark all pending items as dismissed
-        items = db.query(ChecklistItem).filter(
-            ChecklistItem.user_id == user_id,
-            ChecklistItem.status == "pending"
-        ).all()
-        
-        cleared_count = 0
-        for item in items:
-            item.status = "dismissed"
-            item.resolved_at = datetime.utcnow()
-            cleared_count += 1
+        # Mark all pending items as dismissed in a single UPDATE
+        result = db.execute(
+            update(ChecklistItem)
+            .where(ChecklistItem.user_id == user_id, ChecklistItem.status == "pending")
+            .values(status="dismissed", resolved_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        cleared_count = result.rowcount
         
         db.commit()
         
@@ -366,7 +339,7 @@ async def clear_all_checklist_items(
 @router.get("/summary")
 async def get_checklist_summary(
     user_id: str = "default",
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get checklist summary with counts and health metrics.
     
@@ -377,42 +350,42 @@ async def get_checklist_summary(
     Returns:
         Summary data with pending items, backlog health, stakeholders, and reports
     """
-    # Get pending checklist items
-    pending_items = db.query(ChecklistItem).filter(
-        ChecklistItem.user_id == user_id,
-        ChecklistItem.status == "pending"
-    ).count()
-    
-    # Get backlog health
-    latest_health = db.query(BacklogHealth).filter(
-        BacklogHealth.user_id == user_id
-    ).order_by(BacklogHealth.audit_date.desc()).first()
-    
-    # Get stakeholder counts
-    stakeholders = db.query(Stakeholder).filter(
-        Stakeholder.user_id == user_id
-    ).all()
-    
-    total_open_actions = sum(s.open_actions for s in stakeholders)
-    total_overdue = sum(s.overdue_actions for s in stakeholders)
-    total_blocked = sum(s.blocked_actions for s in stakeholders)
-    stakeholders_needing_attention = len([s for s in stakeholders if s.overdue_actions > 0 or s.blocked_actions > 0])
-    
-    # Get release reports
-    ready_reports = db.query(ReleaseReport).filter(
-        ReleaseReport.user_id == user_id,
-        ReleaseReport.status == "ready"
-    ).count()
-    
-    return {
+    # Pending checklist items, ready release reports and the latest backlog
+    # health score in one round-trip
+    pending_items, ready_reports, latest_health_score = db.execute(select(
+        select(func.count()).select_from(ChecklistItem).where(
+            ChecklistItem.user_id == user_id,
+            ChecklistItem.status == "pending"
+        ).scalar_subquery(),
+        select(func.count()).select_from(ReleaseReport).where(
+            ReleaseReport.user_id == user_id,
+            ReleaseReport.status == "ready"
+        ).scalar_subquery(),
+        select(BacklogHealth.health_score).where(
+            BacklogHealth.user_id == user_id
+        ).order_by(BacklogHealth.audit_date.desc()).limit(1).scalar_subquery()
+    )).one()
+    
+    # Stakeholder action totals, aggregated in SQL rather than over loaded rows
+    total_open_actions, total_overdue, total_blocked, stakeholders_needing_attention = db.execute(select(
+        func.coalesce(func.sum(Stakeholder.open_actions), 0),
+        func.coalesce(func.sum(Stakeholder.overdue_actions), 0),
+        func.coalesce(func.sum(Stakeholder.blocked_actions), 0),
+        func.coalesce(func.sum(case(
+            (or_(Stakeholder.overdue_actions > 0, Stakeholder.blocked_actions > 0), 1),
+            else_=0
+        )), 0)
+    ).where(Stakeholder.user_id == user_id)).one()
+    
+    return ORJSONResponse({
         "pending_items": pending_items,
-        "backlog_health_score": float(latest_health.health_score) if latest_health else 100.0,
+        "backlog_health_score": float(latest_health_score) if latest_health_score is not None else 100.0,
         "stakeholders_needing_attention": stakeholders_needing_attention,
         "total_open_actions": total_open_actions,
         "total_overdue_actions": total_overdue,
         "total_blocked_actions": total_blocked,
         "ready_reports": ready_reports
-    }
+    })
 
 
 @router.post("/agents/run/{agent_name}")
@@ -446,13 +419,11 @@ async def run_agent_manually(
                     "checklist_items": []
                 }
             return result
-        except Exception as e:
-            import traceback
-            error_msg = str(e)
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error running story extraction agent")
             raise HTTPException(
                 status_code=500,
-                detail=f"Error running story extraction agent: {error_msg}"
+                detail="Error running story extraction agent"
             )
     
     elif agent_name == "noise_clearing":
@@ -1,18 +1,43 @@
 """Serenity routes for break scheduling."""
+import asyncio
+import logging
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from database import get_db
 from utils.token_manager import get_token
 from utils.google_calendar import get_upcoming_events
 from utils.notion import get_notion_pages
 from utils.gemini import generate_break_suggestions
+from utils.break_cache import get_events_fingerprint
 from utils.wellness_analyzer import analyze_wellness
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 router = APIRouter()
 
+logger = logging.getLogger(__name__)
+
+# In-flight break generations keyed by events fingerprint, the key
+# utils.break_cache stores breaks under. Concurrent schedule polls for the
+# same events share one Gemini call; polls for different events don't wait.
+_break_generations: Dict[str, "asyncio.Task"] = {}
+
+
+async def _generate_breaks_coalesced(events: List[dict], pages: List[dict], user_timezone: str) -> List[dict]:
+    """Generate break suggestions, joining an in-flight generation for the same events."""
+    fingerprint = get_events_fingerprint(events)
+    generation = _break_generations.get(fingerprint)
+    if generation is None:
+        generation = asyncio.create_task(asyncio.to_thread(
+            generate_break_suggestions, events, pages, user_timezone=user_timezone
+        ))
+        _break_generations[fingerprint] = generation
+        generation.add_done_callback(lambda _: _break_generations.pop(fingerprint, None))
+    # Shielded so one caller disconnecting doesn't cancel the others' generation
+    return await asyncio.shield(generation)
+
 
 class BreakSuggestion(BaseModel):
     """Break suggestion model."""
@@ -63,20 +88,39 @@ async def get_schedule(
         events = []
         pages = []
         
-        # Fetch Google Calendar events
+        # Google Calendar and Notion are independent, so fetch them concurrently
+        # in worker threads; either can fail without holding up the other
+        fetches = {}
         if google_token:
-            try:
-                events, new_access_token = get_upcoming_events(
-                    access_token=google_token.access_token,
-                    refresh_token=google_token.refresh_token,
-                    max_results=max_events
-                )
-                # Sort events by start time to ensure consistent ordering
-                # This is critical for stable break generation
-                events = sorted(events, key=lambda e: (e.get('start', ''), e.get('id', '')))
-                
-                # Update token if it was refreshed
-                if new_access_token:
+            fetches["events"] = asyncio.to_thread(
+                get_upcoming_events,
+                access_token=google_token.access_token,
+                refresh_token=google_token.refresh_token,
+                max_results=max_events
+            )
+        if notion_token:
+            # Fetch more pages for wellness analysis (up to 50)
+            wellness_page_count = min(50, max(max_pages * 5, 20))
+            fetches["pages"] = asyncio.to_thread(
+                get_notion_pages,
+                access_token=notion_token.access_token,
+                page_size=wellness_page_count
+            )
+        results = dict(zip(fetches, await asyncio.gather(*fetches.values(), return_exceptions=True)))
+        
+        events_result = results.get("events")
+        if isinstance(events_result, Exception):
+            logger.warning("Error fetching Google Calendar events", exc_info=events_result)
+            # Continue even if Google Calendar fails
+        elif events_result:
+            events, new_access_token = events_result
+            # Sort events by start time to ensure consistent ordering
+            # This is critical for stable break generation
+            events = sorted(events, key=lambda e: (e.get('start', ''), e.get('id', '')))
+            
+            # Update token if it was refreshed
+            if new_access_token:
+                try:
                     from utils.token_manager import save_token
                     save_token(
                         db=db,
@@ -85,22 +129,15 @@ async def get_schedule(
                         refresh_token=google_token.refresh_token,
                         expires_in=None  # Token expiry handled by Google
                     )
-            except Exception as e:
-                print(f"Error fetching Google Calendar events: {str(e)}")
-                # Continue even if Google Calendar fails
+                except Exception:
+                    logger.exception("Error saving refreshed Google token")
         
-        # Fetch Notion pages
-        if notion_token:
-            try:
-                # Fetch more pages for wellness analysis (up to 50)
-                wellness_page_count = min(50, max(max_pages * 5, 20))
-                pages = get_notion_pages(
-                    access_token=notion_token.access_token,
-                    page_size=wellness_page_count
-                )
-            except Exception as e:
-                print(f"Error fetching Notion pages: {str(e)}")
-                # Continue even if Notion fails
+        pages_result = results.get("pages")
+        if isinstance(pages_result, Exception):
+            logger.warning("Error fetching Notion pages", exc_info=pages_result)
+            # Continue even if Notion fails
+        elif pages_result:
+            pages = pages_result
         
         # Generate break suggestions (always generate, cache is optional)
         break_suggestions = []
@@ -109,7 +146,7 @@ async def get_schedule(
                 # Always generate breaks (caching happens inside generate_break_suggestions if needed)
                 # Use user's timezone if provided, otherwise default to UTC
                 user_tz = timezone or 'UTC'
-                suggestions = generate_break_suggestions(events, pages, user_timezone=user_tz)
+                suggestions = await _generate_breaks_coalesced(events, pages, user_tz)
                 
                 # Enhance suggestions with break type metadata
                 from utils.break_types import get_break_type
@@ -130,74 +167,66 @@ async def get_schedule(
                 
                 break_suggestions = [BreakSuggestion(**s) for s in enhanced_suggestions]
             except Exception as e:
-                print(f"Error generating break suggestions: {str(e)}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("Error generating break suggestions")
                 # Don't return empty - let automatic breaks work even if Gemini fails
         
         # Merge with user customizations (if any)
-        # Note: In production, this should fetch from database
-        # For now, customizations are stored in-memory in breaks route
         try:
-            import sys
-            breaks_module = sys.modules.get('routes.breaks')
-            if breaks_module and hasattr(breaks_module, '_break_customizations'):
-                user_id = "default"  # In production, get from auth
-                custom_breaks = breaks_module._break_customizations.get(user_id, [])
-                if custom_breaks:
-                    # Replace or add custom breaks
-                    for custom_break in custom_breaks:
-                        # Find if this break already exists (by time proximity or ID)
-                        existing_index = None
-                        custom_id = custom_break.get('id')
-                        custom_time_str = custom_break.get('time', '')
-                        
-                        if custom_id:
-                            # Try to find by ID first
+            from routes.breaks import get_user_break_customizations
+            user_id = "default"  # In production, get from auth
+            custom_breaks = get_user_break_customizations(db, user_id)
+            if custom_breaks:
+                # Replace or add custom breaks
+                for custom_break in custom_breaks:
+                    # Find if this break already exists (by time proximity or ID)
+                    existing_index = None
+                    custom_id = custom_break.get('id')
+                    custom_time_str = custom_break.get('time', '')
+                    
+                    if custom_id:
+                        # Try to find by ID first
+                        for i, existing in enumerate(break_suggestions):
+                            if hasattr(existing, 'id') and existing.id == custom_id:
+                                existing_index = i
+                                break
+                    
+                    if existing_index is None and custom_time_str:
+                        # Find by time proximity (within 5 minutes)
+                        try:
+                            custom_time = datetime.fromisoformat(custom_time_str.replace('Z', '+00:00'))
                             for i, existing in enumerate(break_suggestions):
-                                if hasattr(existing, 'id') and existing.id == custom_id:
+                                existing_time = datetime.fromisoformat(existing.time.replace('Z', '+00:00'))
+                                time_diff = abs((custom_time - existing_time).total_seconds())
+                                if time_diff < 300:  # Within 5 minutes
                                     existing_index = i
                                     break
-                        
-                        if existing_index is None and custom_time_str:
-                            # Find by time proximity (within 5 minutes)
-                            try:
-                                custom_time = datetime.fromisoformat(custom_time_str.replace('Z', '+00:00'))
-                                for i, existing in enumerate(break_suggestions):
-                                    existing_time = datetime.fromisoformat(existing.time.replace('Z', '+00:00'))
-                                    time_diff = abs((custom_time - existing_time).total_seconds())
-                                    if time_diff < 300:  # Within 5 minutes
-                                        existing_index = i
-                                        break
-                            except Exception:
-                                pass
-                        
-                        if existing_index is not None:
-                            # Replace existing break
-                            break_suggestions[existing_index] = BreakSuggestion(**custom_break)
-                        else:
-                            # Add new custom break
-                            break_suggestions.append(BreakSuggestion(**custom_break))
+                        except Exception:
+                            pass
                     
-                    # Remove duplicates before sorting
-                    # Use a dict to track breaks by ID or time
-                    unique_breaks_dict = {}
-                    for break_item in break_suggestions:
-                        break_id = break_item.id if hasattr(break_item, 'id') else None
-                        break_time = break_item.time if hasattr(break_item, 'time') else ''
-                        
-                        # Use ID as primary key, or time as fallback
-                        key = break_id or break_time
-                        if key and key not in unique_breaks_dict:
-                            unique_breaks_dict[key] = break_item
+                    if existing_index is not None:
+                        # Replace existing break
+                        break_suggestions[existing_index] = BreakSuggestion(**custom_break)
+                    else:
+                        # Add new custom break
+                        break_suggestions.append(BreakSuggestion(**custom_break))
+                
+                # Remove duplicates before sorting
+                # Use a dict to track breaks by ID or time
+                unique_breaks_dict = {}
+                for break_item in break_suggestions:
+                    break_id = break_item.id if hasattr(break_item, 'id') else None
+                    break_time = break_item.time if hasattr(break_item, 'time') else ''
                     
-                    # Convert back to list and sort by time
-                    break_suggestions = list(unique_breaks_dict.values())
-                    break_suggestions.sort(key=lambda x: x.time if hasattr(x, 'time') else '')
+                    # Use ID as primary key, or time as fallback
+                    key = break_id or break_time
+                    if key and key not in unique_breaks_dict:
+                        unique_breaks_dict[key] = break_item
+                
+                # Convert back to list and sort by time
+                break_suggestions = list(unique_breaks_dict.values())
+                break_suggestions.sort(key=lambda x: x.time if hasattr(x, 'time') else '')
         except Exception as e:
-            print(f"Error merging custom breaks: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error merging custom breaks")
             # Continue without customizations if merge fails
         
         # Analyze wellness metrics from Notion pages
@@ -217,7 +246,7 @@ async def get_schedule(
                     wellness_data = cached_data
                 else:
                     # Analyze wellness (will be cached by wellness route)
-                    wellness_data = analyze_wellness(pages)
+                    wellness_data = await asyncio.to_thread(analyze_wellness, pages)
                     # Cache it with fingerprint
                     set_cached_wellness(cache_key, wellness_data, notes_fingerprint)
                 
@@ -233,17 +262,18 @@ async def get_schedule(
                     trend=wellness_data.get("trend", "stable")
                 )
             except Exception as e:
-                print(f"Error analyzing wellness metrics: {str(e)}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("Error analyzing wellness metrics")
                 # Continue without wellness metrics if analysis fails
         
-        return ScheduleResponse(
-            events=events,
-            pages=pages,
-            break_suggestions=break_suggestions,
-            wellness_metrics=wellness_metrics
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching schedule: {str(e)}")
+        # Return the response directly so FastAPI doesn't re-encode and
+        # re-validate it against ScheduleResponse; the models were built above
+        return ORJSONResponse({
+            "events": events,
+            "pages": pages,
+            "break_suggestions": [suggestion.model_dump() for suggestion in break_suggestions],
+            "wellness_metrics": wellness_metrics.model_dump() if wellness_metrics else None
+        })
+    except Exception:
+        logger.exception("Error fetching schedule")
+        raise HTTPException(status_code=500, detail="Error fetching schedule")
 
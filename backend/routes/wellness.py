@@ -1,4 +1,5 @@
 """Wellness analytics routes."""
+import logging
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
 from database import get_db
@@ -11,6 +12,8 @@ from utils.wellness_cache import get_cached_wellness, set_cached_wellness
 
 router = APIRouter()
 
+logger = logging.getLogger(__name__)
+
 
 class WellnessResponse(BaseModel):
     """Wellness response model."""
@@ -106,9 +109,7 @@ async def get_wellness_metrics(
             set_cached_wellness(cache_key, result.dict(), notes_fingerprint)
             return result
         except Exception as e:
-            print(f"Error in wellness analysis: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error in wellness analysis")
             # Return default result instead of raising error, so frontend doesn't break
             result = WellnessResponse(
                 wellness_score=50.0,
@@ -1,9 +1,16 @@
 """Base agent class for all automation agents."""
 from abc import ABC, abstractmethod
 from typing import Dict, List, Any, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
+from sqlalchemy import select
+import asyncio
+import logging
 import uuid
-import json
+
+logger = logging.getLogger(__name__)
+
+# Stories extracted within this window count as part of the current automation run
+CURRENT_RUN_WINDOW = timedelta(minutes=5)
 
 
 class BaseAgent(ABC):
@@ -28,6 +35,55 @@ class BaseAgent(ABC):
         self.user_id = user_id
         self.agent_name = self.__class__.__name__
     
+    @property
+    def model(self):
+        """Gemini model for the current thread, shared by every agent that runs on it.
+        
+        Resolved on each access rather than in __init__, since agents are built
+        on the event loop thread but run in worker threads.
+        """
+        from utils.gemini import get_gemini_model
+        return get_gemini_model()
+    
+    def get_notion_access_token(self) -> Optional[str]:
+        """Look up the stored Notion access token, or None if Notion isn't connected."""
+        from utils.token_manager import get_token
+        
+        notion_token = get_token(self.db, "notion")
+        return notion_token.access_token if notion_token else None
+    
+    def fetch_page_content(self, access_token: str, page_id: str, page_contents: Optional[Dict[str, Dict]] = None) -> Dict:
+        """Get a Notion page's content, using the run's prefetched contents when available.
+        
+        Args:
+            access_token: Notion access token
+            page_id: Notion page ID
+            page_contents: Optional page ID -> content dict shared by the agents in a run
+        """
+        if page_contents and page_id in page_contents:
+            return page_contents[page_id]
+        from utils.notion import get_page_content
+        return get_page_content(access_token, page_id)
+    
+    def current_run_stories_query(self, run_started_at: Optional[datetime] = None):
+        """Build a select() for this user's active stories from the current automation run.
+        
+        Filters on extracted_at so the (user_id, extracted_at) index serves the
+        range; the cutoff is sent as a bound parameter.
+        
+        Args:
+            run_started_at: When the run started (UTC), so every agent in a run
+                shares one window; defaults to now
+        """
+        from database import Story
+        
+        cutoff = (run_started_at or datetime.utcnow()) - CURRENT_RUN_WINDOW
+        return select(Story).where(
+            Story.user_id == self.user_id,
+            Story.status.in_(["pending", "approved"]),
+            Story.extracted_at >= cutoff
+        )
+    
     @abstractmethod
     def run(self, **kwargs) -> Dict[str, Any]:
         """Run the agent's main logic.
@@ -37,6 +93,17 @@ class BaseAgent(ABC):
         """
         pass
     
+    async def arun(self, **kwargs) -> Dict[str, Any]:
+        """Run the agent from async code without blocking the event loop.
+        
+        By default run() is executed in a worker thread. Agents whose I/O is
+        natively async can override this to await it directly.
+        
+        Returns:
+            Dict with results, checklist items, and metadata
+        """
+        return await asyncio.to_thread(self.run, **kwargs)
+    
     def create_checklist_item(
         self,
         item_type: str,
@@ -71,15 +138,14 @@ class BaseAgent(ABC):
             status="pending",
             priority=priority,
             action_type=action_type,
-            action_data=json.dumps(action_data) if action_data else None,
-            meta_data=json.dumps(metadata) if metadata else None,
+            action_data=action_data or None,
+            meta_data=metadata or None,
             user_id=self.user_id,
             created_at=datetime.utcnow()
         )
         
         self.db.add(checklist_item)
         self.db.commit()
-        self.db.refresh(checklist_item)
         
         return checklist_item.id
     
@@ -90,7 +156,17 @@ class BaseAgent(ABC):
             action: Action description
             details: Optional details dictionary
         """
-        print(f"[{self.agent_name}] {action}")
+        logger.info("[%s] %s", self.agent_name, action)
         if details:
-            print(f"  Details: {details}")
+            logger.info("[%s]   Details: %s", self.agent_name, details)
+    
+    def log_error(self, action: str):
+        """Log a failure with the current exception's traceback.
+        
+        Call from inside an except block.
+        
+        Args:
+            action: Error description
+        """
+        logger.exception("[%s] %s", self.agent_name, action)
 
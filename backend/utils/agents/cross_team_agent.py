@@ -3,38 +3,30 @@ import json
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 from .base_agent import BaseAgent
-from utils.gemini import initialize_gemini
-from utils.notion import get_notion_pages, get_page_content
+from utils.notion import get_notion_pages
 import google.generativeai as genai
-import traceback
 
 
 class CrossTeamAgent(BaseAgent):
     """Agent that analyzes cross-team status, dependencies, and risks."""
     
-    def __init__(self, db_session, user_id: str = "default"):
-        """Initialize the cross-team agent."""
-        super().__init__(db_session, user_id)
-        initialize_gemini()
-        self.model = genai.GenerativeModel('gemini-2.5-flash-lite')
-    
-    def run(self, notion_pages: Optional[List[Dict]] = None, events: Optional[List[Dict]] = None) -> Dict[str, Any]:
+    def run(self, notion_pages: Optional[List[Dict]] = None, events: Optional[List[Dict]] = None, page_contents: Optional[Dict[str, Dict]] = None, notion_access_token: Optional[str] = None) -> Dict[str, Any]:
         """Analyze cross-team updates, dependencies, and risks.
         
         Args:
             notion_pages: List of Notion pages to analyze
             events: List of calendar events (for context)
+            page_contents: Optional prefetched page ID -> content, shared across agents in a run
+            notion_access_token: Notion access token already loaded for this run (looked up if omitted)
         
         Returns:
             Dict with team highlights, dependencies, risks, and recommended actions
         """
-        from utils.token_manager import get_token
-        
         self.log_action("Starting cross-team updates analysis")
         
-        # Get Notion token
-        notion_token = get_token(self.db, "notion")
-        if not notion_token:
+        # Use the run's Notion token if given, otherwise look it up
+        access_token = notion_access_token or self.get_notion_access_token()
+        if not access_token:
             return {
                 "success": False,
                 "error": "Notion not connected",
@@ -48,7 +40,7 @@ class CrossTeamAgent(BaseAgent):
         # Fetch recent Notion pages if not provided
         if notion_pages is None:
             try:
-                notion_pages = get_notion_pages(notion_token.access_token, page_size=100, include_archived=False)
+                notion_pages = get_notion_pages(access_token, page_size=100, include_archived=False)
             except Exception as e:
                 self.log_action(f"Error fetching Notion pages: {str(e)}")
                 return {
@@ -62,7 +54,7 @@ class CrossTeamAgent(BaseAgent):
                 }
         
         # Extract text from pages
-        all_text = self._extract_team_text(notion_pages, notion_token.access_token)
+        all_text = self._extract_team_text(notion_pages, access_token, page_contents)
         
         self.log_action(f"Extracted {len(all_text) if all_text else 0} characters from {len(notion_pages)} pages")
         
@@ -148,13 +140,13 @@ class CrossTeamAgent(BaseAgent):
                 "recommended_actions": []
             }
     
-    def _extract_team_text(self, notion_pages: List[Dict], access_token: str) -> str:
+    def _extract_team_text(self, notion_pages: List[Dict], access_token: str, page_contents: Optional[Dict[str, Dict]] = None) -> str:
         """Extract team-related text from pages."""
         text_parts = []
         
         for page in notion_pages[:20]:  # Limit to recent 20 pages
             try:
-                page_content = get_page_content(access_token, page.get("id"))
+                page_content = self.fetch_page_content(access_token, page.get("id"), page_contents)
                 page_text = self._extract_text_from_content(page_content)
                 if page_text:
                     text_parts.append(f"Page: {page.get('title', 'Untitled')}\n{page_text}")
@@ -371,9 +363,7 @@ Return ONLY JSON, no markdown formatting. Keep it concise to fit within token li
                 "recommended_actions": []
             }
         except Exception as e:
-            self.log_action(f"Error parsing response: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            self.log_error(f"Error parsing response: {str(e)}")
             return {
                 "overall_status": f"Error: {str(e)}",
                 "team_highlights": [],
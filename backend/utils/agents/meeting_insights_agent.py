@@ -3,37 +3,30 @@ import json
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 from .base_agent import BaseAgent
-from utils.gemini import initialize_gemini
-from utils.notion import get_notion_pages, get_page_content
+from utils.notion import get_notion_pages
 import google.generativeai as genai
 
 
 class MeetingInsightsAgent(BaseAgent):
     """Agent that extracts insights, decisions, and action items from meeting notes."""
     
-    def __init__(self, db_session, user_id: str = "default"):
-        """Initialize the meeting insights agent."""
-        super().__init__(db_session, user_id)
-        initialize_gemini()
-        self.model = genai.GenerativeModel('gemini-2.5-flash-lite')
-    
-    def run(self, notion_pages: Optional[List[Dict]] = None, events: Optional[List[Dict]] = None) -> Dict[str, Any]:
+    def run(self, notion_pages: Optional[List[Dict]] = None, events: Optional[List[Dict]] = None, page_contents: Optional[Dict[str, Dict]] = None, notion_access_token: Optional[str] = None) -> Dict[str, Any]:
         """Extract meeting insights, decisions, and action items.
         
         Args:
             notion_pages: List of Notion pages to analyze
             events: List of calendar events (for context)
+            page_contents: Optional prefetched page ID -> content, shared across agents in a run
+            notion_access_token: Notion access token already loaded for this run (looked up if omitted)
         
         Returns:
             Dict with meeting summary, decisions, action items, and open questions
         """
-        from utils.token_manager import get_token
-        
         self.log_action("Starting meeting insights extraction")
         
-        # Get Notion token
-        notion_token = get_token(self.db, "notion")
-        if not notion_token:
+        # Use the run's Notion token if given, otherwise look it up
+        access_token = notion_access_token or self.get_notion_access_token()
+        if not access_token:
             return {
                 "success": False,
                 "error": "Notion not connected",
@@ -43,7 +36,7 @@ class MeetingInsightsAgent(BaseAgent):
         # Fetch recent Notion pages if not provided
         if notion_pages is None:
             try:
-                notion_pages = get_notion_pages(notion_token.access_token, page_size=100, include_archived=False)
+                notion_pages = get_notion_pages(access_token, page_size=100, include_archived=False)
             except Exception as e:
                 self.log_action(f"Error fetching Notion pages: {str(e)}")
                 return {
@@ -56,7 +49,7 @@ class MeetingInsightsAgent(BaseAgent):
         meetings = []
         for page in notion_pages[:10]:  # Process most recent 10 pages
             try:
-                page_content = get_page_content(notion_token.access_token, page.get("id"))
+                page_content = self.fetch_page_content(access_token, page.get("id"), page_contents)
                 page_text = self._extract_text_from_content(page_content)
                 
                 if not page_text or len(page_text) < 50:
@@ -237,9 +230,7 @@ Return ONLY JSON, no markdown formatting."""
                 "open_questions": []
             }
         except Exception as e:
-            self.log_action(f"Error parsing response: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            self.log_error(f"Error parsing response: {str(e)}")
             return {
                 "meeting_title": page.get("title", "Untitled"),
                 "meeting_date": page.get("created_time", ""),
@@ -4,23 +4,18 @@ from datetime import datetime, timedelta
 from .base_agent import BaseAgent
 import json
 import uuid
-from utils.gemini import initialize_gemini
 import google.generativeai as genai
-from config import settings
 
 
 class NoiseClearingAgent(BaseAgent):
     """Agent that audits backlog, clusters items, and generates canonical stories."""
     
-    def __init__(self, db_session, user_id: str = "default"):
-        """Initialize the backlog grooming agent."""
-        super().__init__(db_session, user_id)
-        initialize_gemini()
-        self.model = genai.GenerativeModel('gemini-2.5-flash-lite')
-    
-    def run(self, **kwargs) -> Dict[str, Any]:
+    def run(self, run_started_at: Optional[datetime] = None, **kwargs) -> Dict[str, Any]:
         """Run backlog grooming: cluster items, generate canonical stories, and flag duplicates.
         
+        Args:
+            run_started_at: Start of the automation run (UTC); defaults to now
+        
         Returns:
             Dict with clusters, canonical stories, duplicates, and recommendations
         """
@@ -30,15 +25,10 @@ class NoiseClearingAgent(BaseAgent):
         
         # Get all active stories from CURRENT RUN ONLY (last 5 minutes)
         # This prevents processing stories from previous automation runs
-        from datetime import datetime, timedelta
-        recent_cutoff = datetime.utcnow() - timedelta(minutes=5)
-        
         # Only get stories from current automation run to avoid accumulation
-        stories = self.db.query(Story).filter(
-            Story.user_id == self.user_id,
-            Story.status.in_(["pending", "approved"]),
-            Story.created_at >= recent_cutoff  # Only current run
-        ).order_by(Story.created_at.desc()).all()
+        stories = self.db.scalars(
+            self.current_run_stories_query(run_started_at).order_by(Story.extracted_at.desc())
+        ).all()
         
         recent_stories = stories  # All stories are from current run
         
@@ -105,11 +95,11 @@ class NoiseClearingAgent(BaseAgent):
             duplicate_count=len(duplicates),
             low_priority_count=len(low_priority),
             outdated_count=len(outdated),
-            recommendations=json.dumps({
+            recommendations={
                 "duplicates": duplicates,
                 "low_priority": low_priority,
                 "outdated": outdated
-            }),
+            },
             user_id=self.user_id,
             audit_date=datetime.utcnow()
         )
@@ -446,9 +436,7 @@ Return ONLY JSON, no markdown formatting. Keep responses concise. Limit to top 1
                 return []
             
         except Exception as e:
-            self.log_action(f"Error clustering stories: {str(e)}")
-            import traceback
-            self.log_action(f"Traceback: {traceback.format_exc()}")
+            self.log_error(f"Error clustering stories: {str(e)}")
             # Log first 1000 chars of response for debugging
             if 'response_text' in locals() and response_text:
                 self.log_action(f"Response text (first 1000 chars): {response_text[:1000]}")
@@ -482,9 +470,7 @@ Return ONLY JSON, no markdown formatting. Keep responses concise. Limit to top 1
         # If we have many stories, use GenAI for semantic duplicate detection
         if len(stories) > 5:
             try:
-                initialize_gemini()
-                # Use gemini-2.5-flash-lite for good balance of speed and quality
-                model = genai.GenerativeModel('gemini-2.5-flash-lite')
+                model = self.model
                 
                 # Prepare story list for GenAI
                 stories_data = []
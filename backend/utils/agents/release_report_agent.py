@@ -5,19 +5,11 @@ from .base_agent import BaseAgent
 import json
 import uuid
 import google.generativeai as genai
-import traceback
 
 
 class ReleaseReportAgent(BaseAgent):
     """Agent that generates weekly updates, team updates, and release notes."""
     
-    def __init__(self, db_session, user_id: str = "default"):
-        """Initialize the reporting agent."""
-        super().__init__(db_session, user_id)
-        from utils.gemini import initialize_gemini
-        initialize_gemini()
-        self.model = genai.GenerativeModel('gemini-2.5-flash-lite')
-    
     def run(self, **kwargs) -> Dict[str, Any]:
         """Generate weekly updates, team updates, and release notes.
         
@@ -122,9 +114,7 @@ class ReleaseReportAgent(BaseAgent):
             }
             
         except Exception as e:
-            self.log_action(f"Error generating reports: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            self.log_error(f"Error generating reports: {str(e)}")
             return {
                 "success": False,
                 "error": str(e),
@@ -1,22 +1,39 @@
 """Sprint Planning Agent - generates sprint scope, goals, and risk analysis."""
 import json
 from typing import Dict, List, Any, Optional
-from datetime import datetime
 from .base_agent import BaseAgent
-from utils.gemini import initialize_gemini
+from .story_extraction_agent import PRIORITY_ORDER, story_points_or_default
 import google.generativeai as genai
-import traceback
+
+
+def format_stories_for_sprint(stories) -> List[Dict]:
+    """Convert Story rows to the dicts sprint planning works from.
+    
+    Sorted by Priority (High → Medium → Low) then by story points (descending),
+    with unsized stories given their priority's default points.
+    """
+    stories_sorted = sorted(
+        stories,
+        key=lambda s: (PRIORITY_ORDER.get(s.priority, 2), -story_points_or_default(s))
+    )
+    return [
+        {
+            "id": s.id,
+            "title": s.title,
+            "description": s.description,
+            "priority": s.priority,
+            "points": story_points_or_default(s),
+            "story_points": s.story_points,
+            "owner": s.owner,
+            "tags": s.tags or []
+        }
+        for s in stories_sorted
+    ]
 
 
 class SprintPlanningAgent(BaseAgent):
     """Agent that generates sprint plans based on backlog items and team velocity."""
     
-    def __init__(self, db_session, user_id: str = "default"):
-        """Initialize the sprint planning agent."""
-        super().__init__(db_session, user_id)
-        initialize_gemini()
-        self.model = genai.GenerativeModel('gemini-2.5-flash-lite')
-    
     def run(self, stories: Optional[List[Dict]] = None, velocity: int = 13) -> Dict[str, Any]:
         """Generate sprint plan based on backlog items.
         
@@ -27,44 +44,15 @@ class SprintPlanningAgent(BaseAgent):
         Returns:
             Dict with sprint scope, goal, rationale, risks, and stretch item
         """
-        from database import Story
         
         self.log_action("Starting sprint planning")
         
         # Get stories from database if not provided
         # Only get stories from CURRENT RUN (last 5 minutes) to avoid accumulation
         if stories is None:
-            from datetime import timedelta
-            recent_cutoff = datetime.utcnow() - timedelta(minutes=5)
-            stories = self.db.query(Story).filter(
-                Story.user_id == self.user_id,
-                Story.status.in_(["pending", "approved"]),
-                Story.created_at >= recent_cutoff  # Only current run
-            ).all()
-            
-            # Sort by Priority (High → Medium → Low) then by story points (descending)
-            priority_order = {"high": 1, "medium": 2, "low": 3}
-            stories_sorted = sorted(
-                stories,
-                key=lambda s: (
-                    priority_order.get(s.priority, 2),
-                    -(s.story_points if s.story_points else self._estimate_points(s))
-                )
+            stories = format_stories_for_sprint(
+                self.db.scalars(self.current_run_stories_query()).all()
             )
-            
-            stories = [
-                {
-                    "id": s.id,
-                    "title": s.title,
-                    "description": s.description,
-                    "priority": s.priority,
-                    "points": self._estimate_points(s),
-                    "story_points": s.story_points,
-                    "owner": s.owner,
-                    "tags": json.loads(s.tags) if s.tags else []
-                }
-                for s in stories_sorted
-            ]
         
         if not stories:
             self.log_action("No stories found for sprint planning")
@@ -150,19 +138,6 @@ class SprintPlanningAgent(BaseAgent):
                 "stretch_item": None
             }
     
-    def _estimate_points(self, story) -> int:
-        """Estimate story points based on priority and description."""
-        # Use story_points if available, otherwise estimate based on priority
-        if story.story_points:
-            return story.story_points
-        # Fallback estimation: high=8, medium=5, low=3
-        if story.priority == "high":
-            return 8
-        elif story.priority == "medium":
-            return 5
-        else:
-            return 3
-    
     def _build_planning_prompt(self, stories: List[Dict], velocity: int) -> str:
         """Build prompt for sprint planning."""
         # Stories are already sorted by Priority (High → Medium → Low) then by story points
@@ -308,9 +283,7 @@ Return ONLY JSON, no markdown formatting."""
                 "stretch_item": None
             }
         except Exception as e:
-            self.log_action(f"Error parsing response: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            self.log_error(f"Error parsing response: {str(e)}")
             return {
                 "sprint_scope": [],
                 "total_points": 0,
@@ -2,7 +2,6 @@
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 from .base_agent import BaseAgent
-import json
 import uuid
 
 
@@ -63,7 +62,7 @@ class StakeholderAgent(BaseAgent):
                 stakeholder.overdue_actions = data["overdue_actions"]
                 stakeholder.blocked_actions = data["blocked_actions"]
                 stakeholder.last_activity = datetime.utcnow()
-                stakeholder.meta_data = json.dumps({"story_ids": data["stories"]})
+                stakeholder.meta_data = {"story_ids": data["stories"]}
             else:
                 # Create new
                 stakeholder = Stakeholder(
@@ -73,7 +72,7 @@ class StakeholderAgent(BaseAgent):
                     overdue_actions=data["overdue_actions"],
                     blocked_actions=data["blocked_actions"],
                     last_activity=datetime.utcnow(),
-                    meta_data=json.dumps({"story_ids": data["stories"]}),
+                    meta_data={"story_ids": data["stories"]},
                     user_id=self.user_id
                 )
                 self.db.add(stakeholder)
@@ -1,43 +1,60 @@
 """Story Extraction Agent - extracts stories/backlog items from meetings and notes."""
 import json
 import uuid
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from .base_agent import BaseAgent
-from utils.gemini import initialize_gemini
 from utils.notion import get_notion_pages, get_page_content, create_notion_page, find_notion_database
 import google.generativeai as genai
-from config import settings
+
+
+# Extracted stories at or above this confidence are approved without review
+AUTO_APPROVE_CONFIDENCE = 80
+
+
+def is_auto_approved(story) -> bool:
+    """Whether a story was auto-approved at extraction (approved with high enough confidence)."""
+    return story.status == "approved" and (story.confidence or 0) >= AUTO_APPROVE_CONFIDENCE
+
+
+# Priority rank for sorting stories High → Medium → Low; unknown priorities rank as medium
+PRIORITY_ORDER = {"high": 1, "medium": 2, "low": 3}
+
+# Story points assumed for an unsized story, by priority
+DEFAULT_STORY_POINTS = {"high": 8, "medium": 5, "low": 3}
+
+
+def story_points_or_default(story) -> int:
+    """A story's points, or the default for its priority if it has none."""
+    return story.story_points or DEFAULT_STORY_POINTS.get(story.priority, 3)
+
+
+def story_sort_key(story) -> Tuple[int, int]:
+    """Sort key for Priority (High → Medium → Low) then story points (descending)."""
+    return (PRIORITY_ORDER.get(story.priority, 2), -(story.story_points or 0))
 
 
 class StoryExtractionAgent(BaseAgent):
     """Agent that extracts stories/backlog items from meeting notes and Notion pages."""
     
-    def __init__(self, db_session, user_id: str = "default"):
-        """Initialize the story extraction agent."""
-        super().__init__(db_session, user_id)
-        initialize_gemini()
-        # Use gemini-2.5-flash-lite for faster extraction (it's faster and cheaper for this task)
-        self.model = genai.GenerativeModel('gemini-2.5-flash-lite')
-    
-    def run(self, notion_pages: Optional[List[Dict]] = None, events: Optional[List[Dict]] = None, force_reprocess: bool = False) -> Dict[str, Any]:
+    def run(self, notion_pages: Optional[List[Dict]] = None, events: Optional[List[Dict]] = None, force_reprocess: bool = False, notion_access_token: Optional[str] = None) -> Dict[str, Any]:
         """Run story extraction on new/updated meeting notes and Notion pages.
         
         Args:
             notion_pages: List of Notion pages to process (if None, fetches recent pages)
             events: List of calendar events (for context)
+            notion_access_token: Notion access token already loaded for this run (looked up if omitted)
         
         Returns:
             Dict with extracted stories, checklist items, and metadata
         """
         from database import Story
-        from utils.token_manager import get_token
         
         self.log_action("Starting story extraction")
         
-        # Get Notion token
-        notion_token = get_token(self.db, "notion")
-        if not notion_token:
+        # Use the run's Notion token if given, otherwise look it up
+        access_token = notion_access_token or self.get_notion_access_token()
+        if not access_token:
             self.log_action("Notion not connected, skipping story extraction")
             return {
                 "success": False,
@@ -51,7 +68,7 @@ class StoryExtractionAgent(BaseAgent):
             try:
                 self.log_action("Fetching Notion pages...")
                 # Fetch ALL pages with pagination (no limit, but will stop if API doesn't return more)
-                notion_pages = get_notion_pages(notion_token.access_token, page_size=100, include_archived=False)
+                notion_pages = get_notion_pages(access_token, page_size=100, include_archived=False)
                 self.log_action(f"Fetched {len(notion_pages)} Notion pages (all available pages)")
                 
                 if len(notion_pages) == 0:
@@ -63,9 +80,7 @@ class StoryExtractionAgent(BaseAgent):
                     }
             except Exception as e:
                 error_msg = str(e)
-                self.log_action(f"Error fetching Notion pages: {error_msg}")
-                import traceback
-                traceback.print_exc()
+                self.log_error(f"Error fetching Notion pages: {error_msg}")
                 return {
                     "success": False,
                     "error": f"Failed to fetch Notion pages: {error_msg}",
@@ -76,16 +91,10 @@ class StoryExtractionAgent(BaseAgent):
         # Get existing stories to avoid duplicates WITHIN THIS RUN
         # Only check for stories created in the current session/run (last few minutes)
         # This prevents accumulation across multiple automation runs
-        from datetime import timedelta
-        recent_cutoff = datetime.utcnow() - timedelta(minutes=5)
-        
         # Only check for stories created very recently (in current run) to avoid duplicates within the same run
         # Stories from previous runs should have been archived by clear_automation_states()
-        existing_stories = self.db.query(Story).filter(
-            Story.user_id == self.user_id,
-            Story.status.in_(["pending", "approved"]),
-            Story.created_at >= recent_cutoff  # Only check stories from current run (last 5 minutes)
-        ).all()
+        current_run_stories = self.current_run_stories_query()
+        existing_stories = self.db.scalars(current_run_stories).all()
         
         # Build sets for duplicate detection within current run only
         existing_source_ids = {s.source_id for s in existing_stories if s.source_id} if not force_reprocess else set()
@@ -99,6 +108,8 @@ class StoryExtractionAgent(BaseAgent):
         
         # Process each page that hasn't been processed yet
         extracted_stories = []
+        auto_approved = []
+        pending_review = []
         checklist_item_ids = []
         
         # Process pages from the last 30 days (increased from 7 to catch more pages)
@@ -152,16 +163,12 @@ class StoryExtractionAgent(BaseAgent):
         def extract_from_page(page):
             """Extract stories from a single page (thread-safe, no DB operations).
             
-            Creates its own model instance to avoid thread-safety issues.
+            Uses the worker thread's own model instance to avoid thread-safety issues.
             """
             try:
-                # Create a new model instance for this thread (Gemini models are not thread-safe)
-                initialize_gemini()
-                thread_model = genai.GenerativeModel('gemini-2.5-flash-lite')
-                
                 page_id = page.get("id")
                 page_title = page.get("title", "Untitled")
-                stories = self._extract_stories_from_page(page, notion_token.access_token, events, model=thread_model)
+                stories = self._extract_stories_from_page(page, access_token, events)
                 return {
                     "page_id": page_id,
                     "page_title": page_title,
@@ -209,12 +216,11 @@ class StoryExtractionAgent(BaseAgent):
                         continue
                     
                     # Also check database for safety (in case story was just created)
-                    existing_story = self.db.query(Story).filter(
-                        Story.title == story_title,
-                        Story.source_id == page_id,
-                        Story.user_id == self.user_id,
-                        Story.status.in_(["pending", "approved"]),
-                        Story.created_at >= recent_cutoff  # Only check current run
+                    existing_story = self.db.scalars(
+                        current_run_stories.where(
+                            Story.title == story_title,
+                            Story.source_id == page_id
+                        ).limit(1)
                     ).first()
                     
                     if existing_story:
@@ -224,7 +230,7 @@ class StoryExtractionAgent(BaseAgent):
                 
                 # Auto-approve if confidence ≥ 80%
                 confidence = story_data.get("confidence", 70)
-                status = "approved" if confidence >= 80 else "pending"
+                status = "approved" if confidence >= AUTO_APPROVE_CONFIDENCE else "pending"
                 approved_at = datetime.utcnow() if status == "approved" else None
                 
                 # Create story record
@@ -234,7 +240,7 @@ class StoryExtractionAgent(BaseAgent):
                     description=story_data.get("description"),
                     priority=story_data.get("priority", "medium"),
                     status=status,
-                    tags=json.dumps(story_data.get("tags", [])),
+                    tags=story_data.get("tags", []),
                     owner=story_data.get("owner"),
                     source_type="notion",
                     source_id=page_id,
@@ -263,14 +269,7 @@ class StoryExtractionAgent(BaseAgent):
                 pending_review = [s for s in extracted_stories if s.status == "pending"]
                 
                 # Update sort rankings in database (for report page display)
-                priority_order = {"high": 1, "medium": 2, "low": 3}
-                all_stories = auto_approved + pending_review
-                all_stories.sort(
-                    key=lambda s: (
-                        priority_order.get(s.priority, 2),
-                        -(s.story_points if s.story_points else 0)
-                    )
-                )
+                all_stories = sorted(auto_approved + pending_review, key=story_sort_key)
                 
                 for idx, story in enumerate(all_stories):
                     story.sort_ranking = idx + 1
@@ -281,14 +280,6 @@ class StoryExtractionAgent(BaseAgent):
                 
                 self.log_action(f"✅ Extracted {len(extracted_stories)} stories: {len(auto_approved)} auto-approved, {len(pending_review)} pending review")
                 
-                # Store stories in result for report generation
-                result["stories"] = extracted_stories
-                result["auto_approved_stories"] = auto_approved
-                result["pending_review_stories"] = pending_review
-                
-                # Store story IDs in result for report generation
-                result["story_ids"] = [s.id for s in extracted_stories]
-                
                 # Create checklist item for story approvals (only for pending stories)
                 if pending_review:
                     story_ids = [s.id for s in pending_review]
@@ -335,11 +326,13 @@ class StoryExtractionAgent(BaseAgent):
                 }
                 for s in extracted_stories
             ],
+            # IDs of the stories created in this run, so callers can load exactly these
+            "story_ids": [s.id for s in extracted_stories],
             "checklist_items": checklist_item_ids,
             "count": len(extracted_stories),
             "stories_extracted": len(extracted_stories),  # Add this for summary
-            "auto_approved_count": len(auto_approved) if isinstance(auto_approved, list) else 0,
-            "pending_review_count": len(pending_review) if isinstance(pending_review, list) else 0,
+            "auto_approved_count": len(auto_approved),
+            "pending_review_count": len(pending_review),
             "pages_processed": processed_count,
             "pages_skipped_already_processed": skipped_already_processed,
             "pages_skipped_too_old": skipped_too_old,
@@ -420,9 +413,7 @@ class StoryExtractionAgent(BaseAgent):
             return stories
             
         except Exception as e:
-            self.log_action(f"Error extracting stories from page: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            self.log_error(f"Error extracting stories from page: {str(e)}")
             return []
     
     def _extract_text_from_page_content(self, page_content: Dict) -> str:
@@ -596,10 +587,8 @@ Return ONLY JSON, no markdown formatting."""
             self.log_action(f"Response text (first 500 chars): {response_text[:500]}")
             return []
         except Exception as e:
-            self.log_action(f"Error parsing extraction response: {str(e)}")
+            self.log_error(f"Error parsing extraction response: {str(e)}")
             self.log_action(f"Response text (first 500 chars): {response_text[:500]}")
-            import traceback
-            traceback.print_exc()
             return []
     
     def approve_stories(self, story_ids: List[str], create_in_notion: bool = True, database_id: Optional[str] = None) -> Dict[str, Any]:
@@ -663,20 +652,12 @@ Return ONLY JSON, no markdown formatting."""
                 # Create in Notion if requested
                 if create_in_notion and notion_token:
                     try:
-                        # Parse tags
-                        tags = []
-                        if story.tags:
-                            try:
-                                tags = json.loads(story.tags) if isinstance(story.tags, str) else story.tags
-                            except:
-                                tags = []
-                        
                         # Build properties
                         properties = {
                             "priority": story.priority or "medium",
                             "status": "approved",
                             "owner": story.owner,
-                            "tags": tags
+                            "tags": story.tags or []
                         }
                         
                         # Create Notion page
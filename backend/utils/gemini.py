@@ -2,15 +2,38 @@
 import google.generativeai as genai
 import json
 import re
+import threading
 from typing import List, Dict
 from datetime import datetime, timezone, timedelta
 from dateutil import tz as dateutil_tz
-from config import settings
+from config import get_settings
+
+
+GEMINI_MODEL_NAME = 'gemini-2.5-flash-lite'
+
+_gemini_configured = False
+
+# Gemini models are not thread-safe, so each thread keeps its own instance
+# and reuses it instead of building a new one per agent/request
+_thread_local = threading.local()
 
 
 def initialize_gemini():
-    """Initialize Gemini API client."""
-    genai.configure(api_key=settings.gemini_api_key)
+    """Initialize Gemini API client (configured once per process)."""
+    global _gemini_configured
+    if not _gemini_configured:
+        genai.configure(api_key=get_settings().gemini_api_key)
+        _gemini_configured = True
+
+
+def get_gemini_model() -> genai.GenerativeModel:
+    """Get the calling thread's Gemini model, creating it on first use."""
+    model = getattr(_thread_local, "model", None)
+    if model is None:
+        initialize_gemini()
+        model = genai.GenerativeModel(GEMINI_MODEL_NAME)
+        _thread_local.model = model
+    return model
 
 
 def select_break_type_by_duration(duration_minutes: int, gap_minutes: int, meeting_index: int = 0, time_of_day: str = '') -> str:
@@ -6,7 +6,9 @@ from google.auth.transport.requests import Request
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple, Any
 import os
-from config import settings
+import requests
+from functools import lru_cache
+from config import get_settings
 
 
 SCOPES = [
@@ -15,21 +17,37 @@ SCOPES = [
     'https://www.googleapis.com/auth/userinfo.email'
 ]
 
+GOOGLE_USERINFO_URL = "https://www.googleapis.com/oauth2/v2/userinfo"
+
+# Shared HTTP session for direct Google REST calls (keep-alive connection reuse)
+_google_session = requests.Session()
+
+
+@lru_cache(maxsize=1)
+def get_google_client_config() -> Dict[str, Any]:
+    """Build the OAuth client config from settings once and reuse it."""
+    settings = get_settings()
+    return {
+        "web": {
+            "client_id": settings.google_client_id,
+            "client_secret": settings.google_client_secret,
+            "auth_uri": "https://accounts.google.com/o/oauth2/auth",
+            "token_uri": "https://oauth2.googleapis.com/token",
+            "redirect_uris": [settings.google_redirect_uri],
+        }
+    }
+
 
 def get_google_oauth_flow(state: Optional[str] = None) -> Flow:
-    """Create Google OAuth flow."""
+    """Create Google OAuth flow.
+    
+    A new Flow is built per call since it carries per-login state, but the
+    client config it's built from is cached.
+    """
     flow = Flow.from_client_config(
-        {
-            "web": {
-                "client_id": settings.google_client_id,
-                "client_secret": settings.google_client_secret,
-                "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-                "token_uri": "https://oauth2.googleapis.com/token",
-                "redirect_uris": [settings.google_redirect_uri],
-            }
-        },
+        get_google_client_config(),
         scopes=SCOPES,
-        redirect_uri=settings.google_redirect_uri
+        redirect_uri=get_settings().google_redirect_uri
     )
     if state:
         flow.state = state
@@ -38,6 +56,7 @@ def get_google_oauth_flow(state: Optional[str] = None) -> Flow:
 
 def get_credentials_from_token(access_token: str, refresh_token: Optional[str] = None) -> Credentials:
     """Create Credentials object from stored tokens."""
+    settings = get_settings()
     creds = Credentials(
         token=access_token,
         refresh_token=refresh_token,
@@ -62,6 +81,25 @@ def refresh_credentials_if_needed(creds: Credentials) -> Tuple[Credentials, bool
     return creds, was_refreshed
 
 
+def get_google_user_info(access_token: str) -> Dict[str, Any]:
+    """Fetch the user's profile from the userinfo endpoint.
+    
+    Calls the REST endpoint directly rather than through the discovery
+    client, which would parse a discovery document and generate method
+    bindings just for this one GET.
+    
+    Raises:
+        requests.HTTPError: e.g. 403 if the token lacks the userinfo scopes
+    """
+    response = _google_session.get(
+        GOOGLE_USERINFO_URL,
+        headers={"Authorization": f"Bearer {access_token}"},
+        timeout=10
+    )
+    response.raise_for_status()
+    return response.json()
+
+
 def get_upcoming_events(access_token: str, refresh_token: Optional[str] = None, max_results: int = 10) -> Tuple[List[Dict], Optional[str]]:
     """Fetch upcoming events from Google Calendar.
     
@@ -5,7 +5,7 @@ from utils.token_manager import get_token
 from utils.notion import get_notion_pages
 from utils.google_calendar import get_upcoming_events
 from utils.gemini import initialize_gemini
-from config import settings
+from config import get_settings
 import requests
 
 
@@ -142,7 +142,7 @@ def check_gemini_health() -> Dict[str, Any]:
     Returns:
         Dict with Gemini health status
     """
-    if not settings.gemini_api_key:
+    if not get_settings().gemini_api_key:
         return {
             "available": False,
             "status": "not_configured",
@@ -186,7 +186,6 @@ def create_integration_checklist_items(db, user_id: str = "default"):
     from database import ChecklistItem
     import uuid
     from datetime import datetime
-    import json
     
     health = check_integration_health(user_id, db)
     checklist_item_ids = []
@@ -198,7 +197,7 @@ def create_integration_checklist_items(db, user_id: str = "default"):
             ChecklistItem.user_id == user_id,
             ChecklistItem.type == "integration_status",
             ChecklistItem.status == "pending",
-            ChecklistItem.action_data.like('%notion%')
+            ChecklistItem.action_data["service"].as_string() == "notion"
         ).first()
         
         if not existing:
@@ -210,7 +209,7 @@ def create_integration_checklist_items(db, user_id: str = "default"):
                 status="pending",
                 priority="high",
                 action_type="re_authenticate",
-                action_data=json.dumps({"service": "notion"}),
+                action_data={"service": "notion"},
                 meta_data=None,
                 user_id=user_id,
                 created_at=datetime.utcnow()
@@ -225,7 +224,7 @@ def create_integration_checklist_items(db, user_id: str = "default"):
             ChecklistItem.user_id == user_id,
             ChecklistItem.type == "integration_status",
             ChecklistItem.status == "pending",
-            ChecklistItem.action_data.like('%google%')
+            ChecklistItem.action_data["service"].as_string() == "google"
         ).first()
         
         if not existing:
@@ -237,7 +236,7 @@ def create_integration_checklist_items(db, user_id: str = "default"):
                 status="pending",
                 priority="high",
                 action_type="re_authenticate",
-                action_data=json.dumps({"service": "google"}),
+                action_data={"service": "google"},
                 meta_data=None,
                 user_id=user_id,
                 created_at=datetime.utcnow()
@@ -252,7 +251,7 @@ def create_integration_checklist_items(db, user_id: str = "default"):
             ChecklistItem.user_id == user_id,
             ChecklistItem.type == "integration_status",
             ChecklistItem.status == "pending",
-            ChecklistItem.action_data.like('%gemini%')
+            ChecklistItem.action_data["service"].as_string() == "gemini"
         ).first()
         
         if not existing:
@@ -264,7 +263,7 @@ def create_integration_checklist_items(db, user_id: str = "default"):
                 status="pending",
                 priority="medium",
                 action_type="configure_api_key",
-                action_data=json.dumps({"service": "gemini"}),
+                action_data={"service": "gemini"},
                 meta_data=None,
                 user_id=user_id,
                 created_at=datetime.utcnow()
@@ -2,8 +2,21 @@
 import requests
 from typing import List, Dict, Optional, Any
 from datetime import datetime
-from config import settings
 import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from utils.notion_page_cache import get_cached_pages, set_cached_pages
+from utils.token_keys import token_cache_key
+
+logger = logging.getLogger(__name__)
+
+# Shared HTTP session so Notion calls reuse pooled keep-alive connections
+# instead of paying a new TCP + TLS handshake on every request
+_notion_session = requests.Session()
+
+# Resolved database IDs keyed by (token hash, lowercased name); a database
+# keeps its ID for life, so the name lookup only needs to happen once
+_database_id_cache: Dict[tuple, str] = {}
 
 
 def get_notion_pages(access_token: str, page_size: int = 100, max_pages: int = None, include_archived: bool = False) -> List[Dict]:
@@ -57,7 +70,7 @@ def get_notion_pages(access_token: str, page_size: int = 100, max_pages: int = N
             else:
                 print(f"Fetching page {page_number} (first batch)...")
             
-            response = requests.post(url, json=payload, headers=headers)
+            response = _notion_session.post(url, json=payload, headers=headers)
             response.raise_for_status()
             
             data = response.json()
@@ -193,6 +206,23 @@ def get_notion_pages(access_token: str, page_size: int = 100, max_pages: int = N
         raise
 
 
+def get_notion_pages_cached(access_token: str, page_size: int = 100, max_pages: int = None, include_archived: bool = False) -> List[Dict]:
+    """get_notion_pages, served from a short-lived cache when the same listing was just fetched.
+    
+    Use where back-to-back calls are expected (e.g. repeated pipeline triggers).
+    Anything that writes pages should call clear_page_cache afterwards.
+    """
+    options = (page_size, max_pages, include_archived)
+    pages = get_cached_pages(access_token, options)
+    if pages is not None:
+        logger.info("Using cached Notion pages (%d pages)", len(pages))
+        return pages
+    
+    pages = get_notion_pages(access_token, page_size=page_size, max_pages=max_pages, include_archived=include_archived)
+    set_cached_pages(access_token, options, pages)
+    return pages
+
+
 def get_page_content(access_token: str, page_id: str) -> Dict:
     """Get content of a specific Notion page."""
     try:
@@ -204,7 +234,7 @@ def get_page_content(access_token: str, page_id: str) -> Dict:
         
         # Get page
         url = f"https://api.notion.com/v1/pages/{page_id}"
-        response = requests.get(url, headers=headers)
+        response = _notion_session.get(url, headers=headers)
         response.raise_for_status()
         
         page = response.json()
@@ -220,7 +250,7 @@ def get_page_content(access_token: str, page_id: str) -> Dict:
             if start_cursor:
                 params["start_cursor"] = start_cursor
             
-            blocks_response = requests.get(blocks_url, headers=headers, params=params)
+            blocks_response = _notion_session.get(blocks_url, headers=headers, params=params)
             blocks_response.raise_for_status()
             
             data = blocks_response.json()
@@ -271,7 +301,7 @@ def get_page_content(access_token: str, page_id: str) -> Dict:
                     if children_cursor:
                         children_params["start_cursor"] = children_cursor
                     
-                    children_response = requests.get(children_url, headers=headers, params=children_params)
+                    children_response = _notion_session.get(children_url, headers=headers, params=children_params)
                     children_response.raise_for_status()
                     children_data = children_response.json()
                     children_blocks.extend(children_data.get("results", []))
@@ -303,6 +333,27 @@ def get_page_content(access_token: str, page_id: str) -> Dict:
         raise
 
 
+def get_page_contents(access_token: str, page_ids: List[str], max_workers: int = 3) -> Dict[str, Dict]:
+    """Fetch several pages' content concurrently.
+    
+    max_workers defaults to 3 to stay within Notion's ~3 requests/second limit.
+    
+    Returns:
+        Dict of page ID -> get_page_content result; pages Notion failed to
+        return (logged) are left out
+    """
+    def fetch(page_id):
+        try:
+            return page_id, get_page_content(access_token, page_id)
+        except requests.RequestException:
+            logger.warning("Could not fetch content for Notion page %s", page_id, exc_info=True)
+            return page_id, None
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(fetch, page_ids)
+    return {page_id: content for page_id, content in results if content is not None}
+
+
 def create_notion_page(
     access_token: str,
     database_id: Optional[str],
@@ -436,7 +487,7 @@ def create_notion_page(
             url = "https://api.notion.com/v1/pages"
             
             # Create page
-            response = requests.post(url, json=payload, headers=headers)
+            response = _notion_session.post(url, json=payload, headers=headers)
             response.raise_for_status()
             page = response.json()
             
@@ -464,7 +515,7 @@ def create_notion_page(
                         ]
                     }
                     
-                    blocks_response = requests.patch(blocks_url, json=blocks_payload, headers=headers)
+                    blocks_response = _notion_session.patch(blocks_url, json=blocks_payload, headers=headers)
                     blocks_response.raise_for_status()
             
             return page
@@ -513,7 +564,7 @@ def create_page_under_parent(access_token: str, parent_page_id: str, title: str)
             }
         }
         
-        response = requests.post("https://api.notion.com/v1/pages", json=payload, headers=headers)
+        response = _notion_session.post("https://api.notion.com/v1/pages", json=payload, headers=headers)
         response.raise_for_status()
         return response.json()
         
@@ -550,7 +601,7 @@ def add_blocks_to_page(access_token: str, page_id: str, blocks: List[Dict]) -> b
                 "children": batch
             }
             
-            batch_response = requests.patch(blocks_url, json=blocks_payload, headers=headers)
+            batch_response = _notion_session.patch(blocks_url, json=blocks_payload, headers=headers)
             
             if batch_response.status_code != 200:
                 error_text = batch_response.text
@@ -574,6 +625,10 @@ def find_notion_database(access_token: str, database_name: Optional[str] = "Back
     Returns:
         Database ID if found, None otherwise
     """
+    cache_key = (token_cache_key(access_token), (database_name or "").lower())
+    if cache_key in _database_id_cache:
+        return _database_id_cache[cache_key]
+    
     try:
         headers = {
             "Authorization": f"Bearer {access_token}",
@@ -591,7 +646,7 @@ def find_notion_database(access_token: str, database_name: Optional[str] = "Back
             "page_size": 100
         }
         
-        response = requests.post(url, json=payload, headers=headers)
+        response = _notion_session.post(url, json=payload, headers=headers)
         response.raise_for_status()
         
         data = response.json()
@@ -603,9 +658,11 @@ def find_notion_database(access_token: str, database_name: Optional[str] = "Back
             if title_prop:
                 db_title = title_prop[0].get("plain_text", "")
                 if database_name.lower() in db_title.lower():
+                    _database_id_cache[cache_key] = db.get("id")
                     return db.get("id")
         
-        # If not found, return first database or None
+        # If not found, return first database or None (not cached, so a
+        # database created later under the right name is still picked up)
         if databases:
             return databases[0].get("id")
         
@@ -0,0 +1,40 @@
+"""Short-lived cache of Notion page listings so back-to-back pipeline runs don't refetch every page."""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from utils.token_keys import token_cache_key
+
+# Cache of page lists keyed by (token hash, fetch options). Kept short since
+# pages change as people edit them; this only absorbs triggers seconds apart.
+_page_cache: Dict[Tuple, Tuple[List[Dict], datetime]] = {}
+_cache_ttl = timedelta(seconds=45)
+
+
+def get_cached_pages(access_token: str, options: Tuple) -> Optional[List[Dict]]:
+    """Get a cached page list for a token and fetch options if available and not expired.
+
+    Returns:
+        A copy of the cached page list, or None on a miss
+    """
+    cache_key = (token_cache_key(access_token), options)
+    if cache_key in _page_cache:
+        pages, cached_time = _page_cache[cache_key]
+        if datetime.utcnow() - cached_time < _cache_ttl:
+            return list(pages)
+        # Remove expired cache
+        del _page_cache[cache_key]
+    return None
+
+
+def set_cached_pages(access_token: str, options: Tuple, pages: List[Dict]):
+    """Cache a page list for a token and fetch options."""
+    _page_cache[(token_cache_key(access_token), options)] = (list(pages), datetime.utcnow())
+
+
+def clear_page_cache(access_token: Optional[str] = None):
+    """Clear cached page lists for one token, or for all tokens if none is given."""
+    if access_token is None:
+        _page_cache.clear()
+        return
+    token_key = token_cache_key(access_token)
+    for cache_key in [k for k in _page_cache if k[0] == token_key]:
+        del _page_cache[cache_key]
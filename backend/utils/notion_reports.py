@@ -1,33 +1,61 @@
 """Notion report generation utilities for comprehensive meeting reports."""
-import json
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from datetime import datetime
+from utils.agents.story_extraction_agent import is_auto_approved, PRIORITY_ORDER
 from utils.notion import create_page_under_parent, add_blocks_to_page, find_notion_database, create_notion_page, get_notion_pages
 import requests
+from concurrent.futures import ThreadPoolExecutor
 
+# Notion allows about 3 requests per second per integration, so keep
+# concurrent writes at that level
+NOTION_MAX_CONCURRENT_REQUESTS = 3
 
-def create_comprehensive_report_page(
+
+def story_report_fields(story) -> Dict[str, Any]:
+    """Copy the Story fields the report page and Backlog entries use into a plain dict.
+    
+    Both are written from worker threads, possibly after the request's session
+    has closed, so they take these copies rather than ORM rows.
+    """
+    return {
+        "id": story.id,
+        "title": story.title,
+        "description": story.description,
+        "priority": story.priority,
+        "status": story.status,
+        "owner": story.owner,
+        "tags": story.tags or [],
+        "story_points": story.story_points,
+        "confidence": story.confidence,
+        "product": story.product,
+        "auto_approved": is_auto_approved(story),
+    }
+
+
+def _report_sort_key(story: Dict[str, Any]) -> Tuple[int, int]:
+    """Sort key for Priority (High → Medium → Low) then story points (descending)."""
+    return (PRIORITY_ORDER.get(story["priority"], 2), -(story["story_points"] or 0))
+
+
+def create_report_page_shell(
     access_token: str,
     parent_page_id: str,
     meeting_name: str,
-    meeting_date: str,
-    agent_outputs: Dict[str, Any],
-    stories: List[Any],
-    report_url: Optional[str] = None
+    meeting_date: str
 ) -> Optional[Dict]:
-    """Create a comprehensive meeting report page in Notion.
+    """Create the (empty) meeting report page in Notion.
+    
+    Lets callers get the page URL, e.g. to link Backlog entries to it, before
+    the report content is ready; pass the result to create_comprehensive_report_page.
     
     Args:
         access_token: Notion API access token
         parent_page_id: Parent page ID (meeting note page)
         meeting_name: Name of the meeting
         meeting_date: Date of the meeting
-        agent_outputs: Dictionary containing outputs from all 6 agents
-        stories: List of Story objects
-        report_url: Optional URL to link back to the report
     
     Returns:
-        Created page data or None if error
+        Dict with the page's id, url and title, or None if error
     """
     try:
         # Format date
@@ -53,6 +81,50 @@ def create_comprehensive_report_page(
         
         print(f"✅ Created report page: {report_page_id}")
         print(f"📄 Report page URL: {report_page_url}")
+        return {
+            "id": report_page_id,
+            "url": report_page_url,
+            "title": report_title
+        }
+    
+    except Exception as e:
+        print(f"❌ Error creating report page: {str(e)}")
+        return None
+
+
+def create_comprehensive_report_page(
+    access_token: str,
+    parent_page_id: str,
+    meeting_name: str,
+    meeting_date: str,
+    agent_outputs: Dict[str, Any],
+    stories: List[Dict[str, Any]],
+    report_url: Optional[str] = None,
+    report_page: Optional[Dict] = None
+) -> Optional[Dict]:
+    """Create a comprehensive meeting report page in Notion.
+    
+    Args:
+        access_token: Notion API access token
+        parent_page_id: Parent page ID (meeting note page)
+        meeting_name: Name of the meeting
+        meeting_date: Date of the meeting
+        agent_outputs: Dictionary containing outputs from all 6 agents
+        stories: Story dicts from story_report_fields
+        report_url: Optional URL to link back to the report
+        report_page: Page from create_report_page_shell to fill in; created here if not given
+    
+    Returns:
+        Created page data or None if error
+    """
+    try:
+        if report_page is None:
+            report_page = create_report_page_shell(access_token, parent_page_id, meeting_name, meeting_date)
+            if not report_page:
+                return None
+        report_page_id = report_page["id"]
+        report_page_url = report_page["url"]
+        report_title = report_page["title"]
         
         # Build blocks for the report
         blocks = []
@@ -83,8 +155,8 @@ def create_comprehensive_report_page(
         sprint_planning = agent_outputs.get("sprint_planning", {})
         
         stories_extracted = story_extraction.get("stories_extracted", 0)
-        stories_auto_approved = len([s for s in stories if s.status == "approved"])
-        stories_pending = len([s for s in stories if s.status == "pending"])
+        stories_auto_approved = sum(1 for s in stories if s["auto_approved"])
+        stories_pending = len([s for s in stories if s["status"] == "pending"])
         duplicates_found = backlog_grooming.get("duplicate_count", 0)
         action_items = meeting_insights.get("total_action_items", 0)
         
@@ -244,16 +316,10 @@ def create_comprehensive_report_page(
             })
             
             # Auto-approved stories
-            auto_approved_stories = [s for s in stories if s.status == "approved"]
+            auto_approved_stories = [s for s in stories if s["auto_approved"]]
             if auto_approved_stories:
                 # Sort by Priority (High → Medium → Low) then by Story Points (descending)
-                priority_order = {"high": 1, "medium": 2, "low": 3}
-                auto_approved_stories.sort(
-                    key=lambda s: (
-                        priority_order.get(s.priority, 2),
-                        -(s.story_points if s.story_points else 0)
-                    )
-                )
+                auto_approved_stories.sort(key=_report_sort_key)
                 
                 blocks.append({
                     "object": "block",
@@ -274,16 +340,10 @@ def create_comprehensive_report_page(
                 blocks.extend(story_blocks)
             
             # Pending review stories
-            pending_stories = [s for s in stories if s.status == "pending"]
+            pending_stories = [s for s in stories if s["status"] == "pending"]
             if pending_stories:
                 # Sort by Priority (High → Medium → Low) then by Story Points (descending)
-                priority_order = {"high": 1, "medium": 2, "low": 3}
-                pending_stories.sort(
-                    key=lambda s: (
-                        priority_order.get(s.priority, 2),
-                        -(s.story_points if s.story_points else 0)
-                    )
-                )
+                pending_stories.sort(key=_report_sort_key)
                 
                 blocks.append({
                     "object": "block",
@@ -1005,11 +1065,11 @@ def create_comprehensive_report_page(
         return None
 
 
-def _format_stories_as_blocks(stories: List[Any]) -> List[Dict]:
+def _format_stories_as_blocks(stories: List[Dict[str, Any]]) -> List[Dict]:
     """Format stories as Notion blocks for toggle children.
     
     Args:
-        stories: List of Story objects
+        stories: Story dicts from story_report_fields
     
     Returns:
         List of block dictionaries
@@ -1019,17 +1079,11 @@ def _format_stories_as_blocks(stories: List[Any]) -> List[Dict]:
     for idx, story in enumerate(stories):
         story_num = idx + 1
         
-        # Parse tags
-        tags_list = []
-        if story.tags:
-            try:
-                tags_list = json.loads(story.tags) if isinstance(story.tags, str) else story.tags
-            except:
-                tags_list = []
+        tags_list = story["tags"]
         
         # Format priority
         priority_map = {"high": "High", "medium": "Medium", "low": "Low"}
-        priority_display = priority_map.get(story.priority, "Medium")
+        priority_display = priority_map.get(story["priority"], "Medium")
         
         # Story heading
         blocks.append({
@@ -1040,7 +1094,7 @@ def _format_stories_as_blocks(stories: List[Any]) -> List[Dict]:
                     {
                         "type": "text",
                         "text": {
-                            "content": f"Story {story_num}: {story.title}"
+                            "content": f"Story {story_num}: {story['title']}"
                         }
                     }
                 ]
@@ -1050,16 +1104,16 @@ def _format_stories_as_blocks(stories: List[Any]) -> List[Dict]:
         # Story details as bulleted list
         story_details = [
             f"Priority: {priority_display}",
-            f"Owner: {story.owner or 'Unassigned'}",
-            f"Status: {story.status}",
-            f"Story Points: {story.story_points or 5}",
-            f"Confidence: {story.confidence or 70}%",
+            f"Owner: {story['owner'] or 'Unassigned'}",
+            f"Status: {story['status']}",
+            f"Story Points: {story['story_points'] or 5}",
+            f"Confidence: {story['confidence'] or 70}%",
             f"Tags: {', '.join(tags_list) if tags_list else 'None'}",
-            f"Product: {story.product or 'SerenityFlow'}"
+            f"Product: {story['product'] or 'SerenityFlow'}"
         ]
         
-        if story.description:
-            story_details.insert(0, f"Description: {story.description}")
+        if story["description"]:
+            story_details.insert(0, f"Description: {story['description']}")
         
         for detail in story_details:
             blocks.append({
@@ -1082,29 +1136,30 @@ def _format_stories_as_blocks(stories: List[Any]) -> List[Dict]:
 
 def create_backlog_database_entries(
     access_token: str,
-    stories: List[Any],
+    stories: List[Dict[str, Any]],
     report_page_url: Optional[str] = None
 ) -> Dict[str, Any]:
     """Create database entries for auto-approved stories in Backlog database.
     
+    The stories aren't modified; the caller saves the returned page IDs.
+    
     Args:
         access_token: Notion API access token
-        stories: List of Story objects (only auto-approved stories with confidence ≥ 80%)
+        stories: Auto-approved story dicts from story_report_fields; not re-filtered here
         report_page_url: URL of the report page to link as source
     
     Returns:
-        Dictionary with success status, created count, and errors
+        Dictionary with success status, created count, errors, and
+        notion_page_ids mapping story ID -> created Backlog page ID
     """
     try:
-        # Filter to only auto-approved stories (confidence ≥ 80%)
-        auto_approved_stories = [s for s in stories if s.status == "approved" and (s.confidence or 0) >= 80]
-        
-        if not auto_approved_stories:
+        if not stories:
             print("No auto-approved stories to create in database")
             return {
                 "success": True,
                 "created_count": 0,
-                "errors": []
+                "errors": [],
+                "notion_page_ids": {}
             }
         
         # Find or create Backlog database
@@ -1122,60 +1177,60 @@ def create_backlog_database_entries(
         print(f"📊 Found Backlog database: {database_id}")
         
         # Sort stories by priority and story points
-        priority_order = {"high": 1, "medium": 2, "low": 3}
-        auto_approved_stories.sort(
-            key=lambda s: (
-                priority_order.get(s.priority, 2),
-                -(s.story_points if s.story_points else 0)
-            )
-        )
-        
-        # Create database entries
-        created_count = 0
-        errors = []
+        # sorted() rather than sort() so the caller's list isn't reordered
+        auto_approved_stories = sorted(stories, key=_report_sort_key)
         
+        # Build every entry's properties up front (sort_ranking follows the sorted order)
+        entries = []
         for idx, story in enumerate(auto_approved_stories):
-            try:
-                # Parse tags
-                tags_list = []
-                if story.tags:
-                    try:
-                        tags_list = json.loads(story.tags) if isinstance(story.tags, str) else story.tags
-                    except:
-                        tags_list = []
-                
-                # Build properties
-                properties = {
-                    "priority": story.priority or "medium",
-                    "status": "Backlog",
-                    "owner": story.owner,
-                    "tags": tags_list,
-                    "story_points": story.story_points or 5,
-                    "product": story.product or "SerenityFlow",
-                    "sort_ranking": idx + 1
-                }
-                
-                # Add source link if report page URL is provided
-                if report_page_url:
-                    properties["source"] = report_page_url
-                
-                # Create database entry
-                notion_page = create_notion_page(
+            # Build properties
+            properties = {
+                "priority": story["priority"] or "medium",
+                "status": "Backlog",
+                "owner": story["owner"],
+                "tags": story["tags"],
+                "story_points": story["story_points"] or 5,
+                "product": story["product"] or "SerenityFlow",
+                "sort_ranking": idx + 1
+            }
+            
+            # Add source link if report page URL is provided
+            if report_page_url:
+                properties["source"] = report_page_url
+            
+            entries.append((story, properties))
+        
+        # Create database entries concurrently - each is an independent POST,
+        # so overlap the round-trips while staying under Notion's rate limit
+        with ThreadPoolExecutor(max_workers=NOTION_MAX_CONCURRENT_REQUESTS) as executor:
+            futures = [
+                executor.submit(
+                    create_notion_page,
                     access_token=access_token,
                     database_id=database_id,
-                    title=story.title,
-                    description=story.description,
+                    title=story["title"],
+                    description=story["description"],
                     properties=properties
                 )
+                for story, properties in entries
+            ]
+        
+        # Collect results in order
+        created_count = 0
+        errors = []
+        notion_page_ids = {}
+        
+        for (story, _), future in zip(entries, futures):
+            try:
+                notion_page = future.result()
                 
-                # Update story with Notion page ID
-                story.notion_page_id = notion_page.get("id")
+                notion_page_ids[story["id"]] = notion_page.get("id")
                 created_count += 1
                 
-                print(f"✅ Created database entry: {story.title}")
+                print(f"✅ Created database entry: {story['title']}")
                 
             except Exception as e:
-                error_msg = f"Error creating database entry for '{story.title}': {str(e)}"
+                error_msg = f"Error creating database entry for '{story['title']}': {str(e)}"
                 print(f"❌ {error_msg}")
                 errors.append(error_msg)
                 continue
@@ -1187,7 +1242,8 @@ def create_backlog_database_entries(
             "created_count": created_count,
             "total_stories": len(auto_approved_stories),
             "errors": errors,
-            "database_id": database_id
+            "database_id": database_id,
+            "notion_page_ids": notion_page_ids
         }
         
     except Exception as e:
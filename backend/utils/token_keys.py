@@ -0,0 +1,7 @@
+"""Cache keys derived from access tokens."""
+import hashlib
+
+
+def token_cache_key(access_token: str) -> str:
+    """Hash the token so raw credentials aren't held as cache keys."""
+    return hashlib.sha1(access_token.encode()).hexdigest()
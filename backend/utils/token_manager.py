@@ -1,9 +1,10 @@
 """Utility functions for managing OAuth tokens in database."""
 from sqlalchemy.orm import Session
 from database import OAuthToken
+from utils.userinfo_cache import clear_userinfo_cache
+from utils.notion_page_cache import clear_page_cache
 from datetime import datetime, timedelta
-from typing import Optional, Dict
-import json
+from typing import Optional, Dict, List
 
 
 def save_token(db: Session, service: str, access_token: str, refresh_token: Optional[str] = None, 
@@ -13,19 +14,16 @@ def save_token(db: Session, service: str, access_token: str, refresh_token: Opti
     if expires_in:
         token_expiry = datetime.utcnow() + timedelta(seconds=expires_in)
     
-    # Serialize user_info to JSON if provided
-    user_info_json = None
-    if user_info:
-        user_info_json = json.dumps(user_info)
-    
     token = db.query(OAuthToken).filter(OAuthToken.id == service).first()
     
     if token:
         token.access_token = access_token
         token.refresh_token = refresh_token or token.refresh_token
         token.token_expiry = token_expiry
-        if user_info_json is not None:
-            token.user_info = user_info_json
+        if user_info:
+            token.user_info = user_info
+        # New grant (possibly with new scopes), so allow a fresh userinfo lookup
+        token.userinfo_checked_at = None
         token.updated_at = datetime.utcnow()
     else:
         token = OAuthToken(
@@ -33,12 +31,14 @@ def save_token(db: Session, service: str, access_token: str, refresh_token: Opti
             access_token=access_token,
             refresh_token=refresh_token,
             token_expiry=token_expiry,
-            user_info=user_info_json
+            user_info=user_info or None
         )
         db.add(token)
     
     db.commit()
-    db.refresh(token)
+    clear_userinfo_cache()
+    if service == "notion":
+        clear_page_cache()
     return token
 
 
@@ -47,10 +47,33 @@ def get_token(db: Session, service: str) -> Optional[OAuthToken]:
     return db.query(OAuthToken).filter(OAuthToken.id == service).first()
 
 
+def update_user_info(db: Session, token: OAuthToken, user_info: Optional[Dict] = None):
+    """Record a userinfo lookup on an already-loaded token and commit.
+    
+    Always stamps userinfo_checked_at, so a failed lookup (e.g. missing
+    scopes) isn't retried on every poll. user_info is only written if given.
+    Only the changed columns go into the UPDATE, and the caller's token
+    object stays current for the rest of the request.
+    """
+    token.userinfo_checked_at = datetime.utcnow()
+    if user_info:
+        token.user_info = user_info
+    db.commit()
+
+
+def get_tokens(db: Session, services: List[str]) -> Dict[str, OAuthToken]:
+    """Get OAuth tokens for several services in one query, keyed by service."""
+    tokens = db.query(OAuthToken).filter(OAuthToken.id.in_(services)).all()
+    return {token.id: token for token in tokens}
+
+
 def delete_token(db: Session, service: str):
     """Delete OAuth token from database."""
     token = db.query(OAuthToken).filter(OAuthToken.id == service).first()
     if token:
         db.delete(token)
         db.commit()
+        clear_userinfo_cache()
+        if service == "notion":
+            clear_page_cache()
 
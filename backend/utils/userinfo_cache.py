@@ -0,0 +1,35 @@
+"""Cache for Google userinfo lookups so /auth/status doesn't call Google on every poll."""
+from datetime import datetime, timedelta
+from typing import Dict, Tuple, Optional
+from utils.token_keys import token_cache_key
+
+# Cache of userinfo keyed by access token hash. An empty dict records a failed
+# lookup (e.g. token without userinfo scopes) so it isn't retried every poll.
+_userinfo_cache: Dict[str, Tuple[Dict, datetime]] = {}
+_cache_ttl = timedelta(minutes=5)
+
+
+def get_cached_userinfo(access_token: str) -> Optional[Dict]:
+    """Get cached userinfo for an access token if available and not expired.
+    
+    Returns:
+        The userinfo dict (empty if the last lookup failed), or None on a miss
+    """
+    cache_key = token_cache_key(access_token)
+    if cache_key in _userinfo_cache:
+        user_info, cached_time = _userinfo_cache[cache_key]
+        if datetime.utcnow() - cached_time < _cache_ttl:
+            return user_info
+        # Remove expired cache
+        del _userinfo_cache[cache_key]
+    return None
+
+
+def set_cached_userinfo(access_token: str, user_info: Optional[Dict]):
+    """Cache userinfo for an access token (None/empty records a failed lookup)."""
+    _userinfo_cache[token_cache_key(access_token)] = (user_info or {}, datetime.utcnow())
+
+
+def clear_userinfo_cache():
+    """Clear all cached userinfo."""
+    _userinfo_cache.clear()
@@ -6,7 +6,7 @@ from collections import Counter, defaultdict
 import json
 from dateutil import parser as date_parser
 from dateutil import tz
-from config import settings
+from config import get_settings
 import google.generativeai as genai
 
 
@@ -296,12 +296,12 @@ def analyze_notes_batch_gemini(notes_content: List[Tuple[str, str]]) -> List[Tup
         List of tuples (sentiment, clarity) in same order as input
     """
     try:
-        if not settings.gemini_api_key or not notes_content:
+        if not get_settings().gemini_api_key or not notes_content:
             # Fallback to keyword-based analysis
             return [(analyze_sentiment_keywords(content), analyze_clarity_keywords(content)) 
                    for _, content in notes_content]
         
-        genai.configure(api_key=settings.gemini_api_key)
+        genai.configure(api_key=get_settings().gemini_api_key)
         model = genai.GenerativeModel('gemini-2.5-flash-lite')
         
         # Prepare batch prompt with all notes
@@ -611,10 +611,10 @@ def generate_insights_with_gemini(notes: List[Dict], wellness_score: float, enga
                                    active_days: int, avg_sentiment: float, avg_clarity: float) -> List[str]:
     """Generate insights using Gemini AI."""
     try:
-        if not settings.gemini_api_key:
+        if not get_settings().gemini_api_key:
             return generate_insights(notes)
         
-        genai.configure(api_key=settings.gemini_api_key)
+        genai.configure(api_key=get_settings().gemini_api_key)
         model = genai.GenerativeModel('gemini-2.5-flash-lite')
         
         # Prepare summary
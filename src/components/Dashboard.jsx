@@ -196,6 +196,31 @@ const Dashboard = () => {
   }, [isMuted, location.pathname, currentTheme, startCalmingAudio, stopCalmingAudio, scheduleData]);
 
 
+  // Poll for the Notion report page the backend finishes after responding
+  const pollLastReport = async (attempt = 0) => {
+    if (attempt >= 40) return;
+    try {
+      const { data } = await axios.get(`${API_BASE_URL}/api/automation/last-report`);
+      if (data.status === 'pending') {
+        setTimeout(() => pollLastReport(attempt + 1), 3000);
+        return;
+      }
+      if (data.status === 'created') {
+        setMeetingEndedResults((prev) => prev && {
+          ...prev,
+          summary: {
+            ...prev.summary,
+            report_page_url: data.report_page?.url,
+            report_page_title: data.report_page?.title,
+            database_entries_created: data.database_entries?.created_count || 0,
+          },
+        });
+      }
+    } catch (err) {
+      console.error('Error fetching last report:', err);
+    }
+  };
+
   const handleMeetingEnded = async () => {
     setMeetingEndedProcessing(true);
     setProcessingStage('Starting automation pipeline...');
@@ -239,7 +264,12 @@ const Dashboard = () => {
         
         // Play accept sound when automation completes successfully
         playAccept();
-        
+
+        // The Notion report is finished after the response - poll for its link
+        if (response.data.report_status === 'pending') {
+          pollLastReport();
+        }
+
         // Reload checklist and schedule
         setTimeout(() => {
           loadDashboardData(true);